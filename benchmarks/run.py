@@ -0,0 +1,199 @@
+"""
+Benchmarks of syncevents, routing reads and app startup on a synthetic registry.
+
+    python -m benchmarks.run --apps 100 --events 100 --tasks 20 --output bench_output.txt
+
+Runs on an in-memory SQLite database by default. Set BENCHMARK_DATABASE=postgresql to run on a local PostgreSQL server
+configured with the PG* environment variables; a test database is created and destroyed. Every measurement is written
+as one JSON object per line with its wall time, query count and peak traced memory.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+
+def build_registry(registry, app_count, event_count, task_count):
+    """
+    Adds to registry, for every app, event_count local events and event_count remote events of a remote app, each
+    remote event with task_count tasks of the app.
+    """
+    from celery_events.events import Task
+
+    for i in range(app_count):
+        for j in range(event_count):
+            registry.create_local_event('app_{0}'.format(i), 'event_{0}'.format(j))
+            remote_event = registry.remote_event('remote_app_{0}'.format(i), 'event_{0}'.format(j))
+            for k in range(task_count):
+                remote_event.add_task(Task.local_instance(
+                    'app_{0}.task_{1}'.format(i, k),
+                    queue='queue_{0}'.format(k % 5),
+                    use_routes=False
+                ))
+
+
+def create_remote_events(registry):
+    from django_celery_events import models, utils
+
+    utils.bulk_create_with_ids([
+        models.Event(app_name=event.app_name, event_name=event.event_name)
+        for event in registry.remote_events
+    ])
+
+
+def change_registry(registry, app_count):
+    """
+    Adds a task to one remote event and a local event to every tenth app.
+    """
+    from celery_events.events import Task
+
+    for i in range(0, app_count, 10):
+        registry.create_local_event('app_{0}'.format(i), 'new_event')
+        remote_event = registry.remote_event('remote_app_{0}'.format(i), 'event_0')
+        remote_event.add_task(Task.local_instance('app_{0}.new_task'.format(i), use_routes=False))
+
+
+def build_events_modules(registry, app_count, task_count, subscribe):
+    from celery import Celery
+
+    celery_app = Celery('benchmarks')
+    modules = {}
+    remote_events = {}
+    for event in registry.remote_events:
+        remote_events.setdefault(event.app_name, []).append(event)
+
+    for i in range(app_count):
+        module = types.ModuleType('app_{0}.events'.format(i))
+        c_tasks = [
+            celery_app.task(name='app_{0}.task_{1}'.format(i, k))(lambda: None)
+            for k in range(task_count)
+        ]
+        subscribed_events = remote_events.get('remote_app_{0}'.format(i), [])
+        for j, event in enumerate(subscribed_events):
+            setattr(module, 'EVENT_{0}'.format(j), event)
+
+        def get_event_c_tasks(event, app_name='remote_app_{0}'.format(i), c_tasks=c_tasks):
+            return c_tasks if event.app_name == app_name else []
+
+        module.get_event_c_tasks = get_event_c_tasks
+        if subscribe:
+            module.SUBSCRIBED_EVENTS = subscribed_events
+        modules['app_{0}'.format(i)] = types.ModuleType('app_{0}'.format(i))
+        modules['app_{0}.events'.format(i)] = module
+
+    return modules
+
+
+def measure(results, name, func, **info):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+    with CaptureQueriesContext(connection) as queries:
+        started_on = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - started_on
+
+    result = {
+        'name': name,
+        'seconds': round(seconds, 6),
+        'queries': len(queries),
+        'peak_memory_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+        'database': connection.vendor,
+    }
+    result.update(info)
+    results.append(result)
+    return result
+
+
+def run(app_count, event_count, task_count, trace_memory):
+    import django
+    from django.db import connection
+
+    django.setup()
+
+    import django_celery_events
+    from django_celery_events import registry
+    from django_celery_events.apps import DjangoCeleryEventsConfig
+    from django_celery_events.backends import DjangoDBBackend
+    from django_celery_events.management.commands import syncevents
+
+    test_database_name = connection.creation.create_test_db(verbosity=0)
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        info = {'apps': app_count, 'events': event_count, 'tasks': task_count}
+        results = []
+        namespaces = ['app_{0}'.format(i) for i in range(app_count)]
+        build_registry(registry, app_count, event_count, task_count)
+        create_remote_events(registry)
+
+        def sync():
+            backend = DjangoDBBackend(registry)
+            backend.scope(namespaces)
+            syncevents.Command(stdout=io.StringIO()).sync_with_fingerprints(backend, force=False, dry_run=False)
+
+        measure(results, 'syncevents_cold', sync, **info)
+        measure(results, 'syncevents_noop', sync, **info)
+        change_registry(registry, app_count)
+        measure(results, 'syncevents_incremental', sync, **info)
+
+        backend = DjangoDBBackend(registry)
+        remote_events = list(registry.remote_events)
+        remote_namespaces = sorted(set(event.app_name for event in remote_events))
+        measure(results, 'fetch_events', lambda: backend.fetch_events(remote_events), **info)
+        measure(
+            results,
+            'fetch_events_for_namespaces',
+            lambda: backend.fetch_events_for_namespaces(remote_namespaces),
+            **info
+        )
+
+        app, app_registry = django_celery_events.app, django_celery_events.registry
+        for name, subscribe in (('ready', False), ('ready_subscribed', True)):
+            modules = build_events_modules(registry, app_count, task_count, subscribe)
+            with mock.patch('django_celery_events.apps.settings') as mock_settings, \
+                    mock.patch.dict(sys.modules, modules):
+                mock_settings.INSTALLED_APPS = namespaces
+                measure(results, name, lambda: DjangoCeleryEventsConfig.ready(None), **info)
+            django_celery_events.app, django_celery_events.registry = app, app_registry
+
+        return results
+
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        connection.creation.destroy_test_db(test_database_name, verbosity=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apps', type=int, default=100, help='Number of apps.')
+    parser.add_argument('--events', type=int, default=100, help='Number of local and remote events per app.')
+    parser.add_argument('--tasks', type=int, default=20, help='Number of tasks per remote event.')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace memory, which slows down the runs.')
+    parser.add_argument('--output', help='File to write the results to. Defaults to stdout.')
+    args = parser.parse_args(argv)
+
+    results = run(args.apps, args.events, args.tasks, not args.no_memory)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in results:
+            output.write(json.dumps(result) + '\n')
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import os
+
+SECRET_KEY = 'benchmarks'
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django_celery_events',
+]
+
+if os.environ.get('BENCHMARK_DATABASE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'django_celery_events_benchmarks'),
+            'USER': os.environ.get('PGUSER', ''),
+            'PASSWORD': os.environ.get('PGPASSWORD', ''),
+            'HOST': os.environ.get('PGHOST', 'localhost'),
+            'PORT': os.environ.get('PGPORT', ''),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('BENCHMARK_SQLITE_NAME', ':memory:'),
+        }
+    }
+
+USE_TZ = True
+
+EVENTS_BACKEND = 'django_celery_events.backends.DjangoDBBackend'
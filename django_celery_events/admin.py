@@ -1,32 +1,37 @@
+from functools import lru_cache
+
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
-from django.urls import reverse
-from django.utils.html import format_html
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Count, Prefetch
+from django.urls import get_script_prefix, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
 
 from django_celery_events import models
+from django_celery_events.backends import tombstone_events, touch_events
 
 
-def linkify(obj, display_obj=lambda o: str(o)):
-    if obj is None:
-        return '-'
-    link = reverse(
-        'admin:{0}_{1}_change'.format(
-            obj._meta.app_label,
-            obj._meta.model_name
-        ),
-        args=[obj.pk]
-    )
-    return format_html('<a href="{0}">{1}</a>'.format(link, display_obj(obj)))
+# Maximum number of tasks listed per event on the event change list.
+TASK_LIST_LIMIT = 10
+
+
+@lru_cache()
+def get_change_url_format(app_label, model_name, script_prefix):
+    """
+    Returns the URL of the admin change page of a model with `__pk__` in place of the primary key, so that the links
+    to many objects are built without reversing the URL of each. The script prefix is only part of the cache key.
+    """
+    return reverse('admin:{0}_{1}_change'.format(app_label, model_name), args=['__pk__'])
 
 
-def as_html_list(lines):
-    if len(lines) > 0:
-        value = '<p>'
-        for line in lines:
-            value += line + '<br>'
-        return format_html(value + '</p>')
-    else:
-        return '-'
+class EventChangeList(ChangeList):
+
+    def get_queryset(self, request, *args, **kwargs):
+        # Only the first TASK_LIST_LIMIT tasks of each event are read, sorted by the database. The prefetch is not
+        # done by EventAdmin.get_queryset, as the change form would then only see these tasks.
+        tasks = models.Task.objects.only('pk', 'name', 'queue').order_by('name', 'pk')[:TASK_LIST_LIMIT]
+        return super().get_queryset(request, *args, **kwargs).prefetch_related(Prefetch('tasks', queryset=tasks))
 
 
 class EventAdmin(ModelAdmin):
@@ -38,13 +43,52 @@ class EventAdmin(ModelAdmin):
         'updated_on',
         'created_on'
     )
+    list_filter = ('app_name',)
+    # Case sensitive prefix lookups, which the indexes on these columns serve, unlike case insensitive ones
+    search_fields = ('app_name__startswith', 'event_name__startswith')
+    search_help_text = 'Search by the start of the app name or event name.'
+    autocomplete_fields = ('tasks',)
+    show_full_result_count = False
 
     def task_list(self, obj):
-        tasks = sorted(obj.tasks.all(), key=lambda t: t.name)
-        return as_html_list([linkify(task) for task in tasks])
+        if obj.task_count == 0:
+            return '-'
+
+        url_format = get_change_url_format(
+            models.Task._meta.app_label,
+            models.Task._meta.model_name,
+            get_script_prefix()
+        )
+        links = format_html_join(
+            mark_safe('<br>'),
+            '<a href="{0}">{1}</a>',
+            ((url_format.replace('__pk__', str(task.pk)), task) for task in obj.tasks.all())
+        )
+        if obj.task_count > TASK_LIST_LIMIT:
+            return format_html('<p>{0}<br>and {1} more</p>', links, obj.task_count - TASK_LIST_LIMIT)
+
+        return format_html('<p>{0}</p>', links)
+
+    task_list.admin_order_field = 'task_count'
+
+    def get_changelist(self, request, **kwargs):
+        return EventChangeList
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        touch_events([form.instance.pk], using=form.instance._state.db)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        tombstone_events([(obj.app_name, obj.event_name)], using=obj._state.db)
+
+    def delete_queryset(self, request, queryset):
+        event_keys = list(queryset.values_list('app_name', 'event_name'))
+        super().delete_queryset(request, queryset)
+        tombstone_events(event_keys, using=queryset.db)
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('tasks').order_by('app_name', 'event_name')
+        return super().get_queryset(request).annotate(task_count=Count('tasks')).order_by('app_name', 'event_name')
 
 
 class TaskAdmin(ModelAdmin):
@@ -52,6 +96,26 @@ class TaskAdmin(ModelAdmin):
         'name',
         'queue'
     )
+    list_filter = ('queue',)
+    search_fields = ('name__startswith', 'queue__startswith')
+    search_help_text = 'Search by the start of the task name or queue.'
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        touch_events(list(obj.event_set.values_list('pk', flat=True)), using=obj._state.db)
+
+    def delete_model(self, request, obj):
+        event_pks = list(obj.event_set.values_list('pk', flat=True))
+        super().delete_model(request, obj)
+        touch_events(event_pks, using=obj._state.db)
+
+    def delete_queryset(self, request, queryset):
+        event_pks = set(
+            models.Event.objects.using(queryset.db).filter(tasks__in=queryset).values_list('pk', flat=True)
+        )
+        super().delete_queryset(request, queryset)
+        touch_events(event_pks, using=queryset.db)
 
     def get_queryset(self, request):
         return super().get_queryset(request).order_by('name')
@@ -1,4 +1,6 @@
 import importlib
+import logging
+import time
 
 from celery import Task
 from celery_events import App
@@ -9,6 +11,8 @@ from django.conf import settings
 
 from django_celery_events import configs
 
+logger = logging.getLogger(__name__)
+
 
 class DjangoCeleryEventsConfig(AppConfig):
     name = 'django_celery_events'
@@ -25,20 +29,35 @@ class DjangoCeleryEventsConfig(AppConfig):
         dce.app = app
         dce.registry = app.registry
 
+        # Load events from the manifest, if it is up to date
+        manifest_path = configs.get_events_manifest()
+        if manifest_path:
+            from django_celery_events import manifest
+
+            manifest_data = manifest.read_manifest(manifest_path)
+            if manifest_data is not None:
+                manifest.load_manifest(app.registry, manifest_data)
+                logger.debug('Loaded events from manifest %s.', manifest_path)
+                return
+
+            logger.warning('Events manifest %s is missing or out of date. Discovering events.', manifest_path)
+
         app_module_list = []
-        events = []
+        events = {}
+        timings = {}
 
         # Import events
         for app in settings.INSTALLED_APPS:
             try:
                 if not app == 'django_celery_events':
+                    started_on = time.perf_counter()
                     module = importlib.import_module(app + '.events')
                     app_module_list.append((app, module))
                     for o in module.__dict__.values():
                         if isinstance(o, Event):
-                            events.append(o)
+                            events.setdefault((o.app_name, o.event_name), o)
 
-                    print('Imported events from {0}.'.format(app))
+                    timings[app] = [time.perf_counter() - started_on, 0]
 
             except ModuleNotFoundError:
                 pass
@@ -46,7 +65,8 @@ class DjangoCeleryEventsConfig(AppConfig):
         # Add tasks to events
         for app, module in app_module_list:
             if hasattr(module, 'get_event_c_tasks'):
-                for event in events:
+                started_on = time.perf_counter()
+                for event in _get_subscribed_events(app, module, events):
                     c_tasks = module.get_event_c_tasks(event) or []
                     for c_task in c_tasks:
                         if not isinstance(c_task, Task):
@@ -54,4 +74,31 @@ class DjangoCeleryEventsConfig(AppConfig):
 
                         event.add_local_c_task(c_task)
 
-                print('Added tasks from {0}.'.format(app))
+                timings[app][1] = time.perf_counter() - started_on
+
+        for app, (import_time, add_tasks_time) in timings.items():
+            logger.debug(
+                'Imported events from %s in %.1f ms and added tasks in %.1f ms.',
+                app, import_time * 1000, add_tasks_time * 1000
+            )
+
+
+def _get_subscribed_events(app, module, events):
+    """
+    Returns the events to pass to get_event_c_tasks of an events module. These are the events listed in
+    SUBSCRIBED_EVENTS of the module, as events or (app_name, event_name) tuples, or all events if it is not set.
+    """
+    subscribed_events = getattr(module, 'SUBSCRIBED_EVENTS', None)
+    if subscribed_events is None:
+        return events.values()
+
+    module_events = []
+    for subscribed_event in subscribed_events:
+        if isinstance(subscribed_event, Event):
+            module_events.append(subscribed_event)
+        elif tuple(subscribed_event) in events:
+            module_events.append(events[tuple(subscribed_event)])
+        else:
+            logger.warning('Event %s subscribed by %s is not declared by any application.', subscribed_event, app)
+
+    return module_events
@@ -1,125 +1,1435 @@
+import hashlib
+import json
+import time
+import uuid
 from abc import ABC
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from itertools import groupby
 
+from asgiref.sync import sync_to_async
 from celery_events.backends import Backend
 from celery_events.events import Event, Task
 
 from django.apps import apps
-from django.db import transaction
-from django.db.models import Q
+from django.core.cache import caches
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, Count, F, Min, Model, Q, Value, When
+from django.db.models.functions import StrIndex, Substr
+from django.utils import timezone
 from django_bulk_update.helper import bulk_update
 
+from django_celery_events import signals
+
+
+# Maximum number of event names looked up by a single query. Kept below the
+# SQLite limit on the number of query parameters.
+LOOKUP_CHUNK_SIZE = 500
+
+# Sync lock. The advisory lock key is used on PostgreSQL, the lease elsewhere.
+SYNC_LOCK_NAME = 'django_celery_events.sync'
+SYNC_LOCK_ADVISORY_KEY = 0x44434553
+SYNC_LOCK_LEASE = timedelta(minutes=10)
+SYNC_LOCK_POLL_INTERVAL = 1
+
 
 class BaseDjangoBackend(Backend, ABC):
+    namespaces = None
 
     def get_local_namespaces(self):
+        if self.namespaces is not None:
+            return self.namespaces
+
         return apps.all_models.keys()
 
     def get_task_namespace(self, task):
         return task.name.split('.')[0]
 
+    def get_registry_namespaces(self):
+        """
+        Returns the local namespaces that have local events or tasks in the registry.
+        """
+        local_namespaces = set(self.get_local_namespaces())
+        namespaces = set(event.app_name for event in self.registry.local_events)
+        for event in self.registry.events:
+            namespaces.update(self.get_task_namespace(task) for task in event.tasks)
+
+        return sorted(namespaces & local_namespaces)
+
+    def scope(self, namespaces, remote_event_keys=None):
+        """
+        Restricts the backend to the given local namespaces. Syncs then only create and delete the local events of
+        these namespaces, and only change the tasks of these namespaces on remote events. If remote_event_keys is
+        given, only the remote events with these (app_name, event_name) keys are synced.
+        """
+        registry = self.registry.registry if isinstance(self.registry, ScopedRegistry) else self.registry
+        self.namespaces = list(namespaces)
+        self.registry = ScopedRegistry(registry, self.namespaces, remote_event_keys=remote_event_keys)
+
+    def get_namespace_fingerprints(self):
+        """
+        Returns a hash of the registry content owned by each local namespace: its local events, and the tasks of the
+        namespace with their queues on any event. Namespaces without content are left out.
+        """
+        local_namespaces = set(self.get_local_namespaces())
+        contents = defaultdict(list)
+        for event in self.registry.local_events:
+            if event.app_name in local_namespaces:
+                contents[event.app_name].append(['event', event.app_name, event.event_name])
+
+        for event in self.registry.events:
+            for task in event.tasks:
+                namespace = self.get_task_namespace(task)
+                if namespace in local_namespaces:
+                    contents[namespace].append(['task', event.app_name, event.event_name, task.name, task.queue])
+
+        return {
+            namespace: hashlib.sha1(json.dumps(sorted(content, key=str)).encode()).hexdigest()
+            for namespace, content in contents.items()
+        }
+
+
+class ScopedRegistry:
+    """
+    View of a registry restricted to the local events of the given namespaces. Remote events are all kept, since any
+    of them may hold tasks of the namespaces in the backend, unless remote_event_keys restricts them to the remote
+    events known to have changed.
+    """
+
+    def __init__(self, registry, namespaces, remote_event_keys=None):
+        self.registry = registry
+        self.namespaces = set(namespaces)
+        self.remote_event_keys = set(remote_event_keys) if remote_event_keys is not None else None
+
+    @property
+    def local_events(self):
+        return [event for event in self.registry.local_events if event.app_name in self.namespaces]
+
+    @property
+    def remote_events(self):
+        if self.remote_event_keys is None:
+            return list(self.registry.remote_events)
+
+        return [
+            event for event in self.registry.remote_events
+            if (event.app_name, event.event_name) in self.remote_event_keys
+        ]
+
+    @property
+    def events(self):
+        return self.local_events + self.remote_events
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'registry':
+            raise AttributeError(name)
+        return getattr(self.registry, name)
+
 
 class DjangoDBBackend(BaseDjangoBackend):
+    _changes = None
+
+    def __init__(self, *args, **kwargs):
+        from django_celery_events import configs
+
+        super().__init__(*args, **kwargs)
+        self.dry_run = False
+        self.planned_changes = []
+        self.database = configs.get_database()
+        self.read_database = configs.get_read_database()
+        self._sync_depth = 0
+        self._sync_updated_ons = None
+        self._sync_lock_owner = None
+        self.routing_version_bumps = 0
+
+    def get_read_database(self):
+        """
+        Returns the database that fetches go to. Fetches made while syncing go to the database written to, as they must
+        not lag behind the writes.
+        """
+        return self.database if self._sync_depth > 0 else self.read_database
+
+    def get_registry_namespaces(self):
+        """
+        Returns the local namespaces that have local events or tasks in the registry, had at their last sync, or own
+        events or tasks in the backend, so that namespaces whose last event or task was removed are still synced.
+        """
+        from django_celery_events import models
+
+        local_namespaces = set(self.get_local_namespaces())
+        namespaces = set(super().get_registry_namespaces())
+        namespaces.update(
+            models.NamespaceFingerprint.objects.using(self.database)
+            .filter(namespace__in=local_namespaces)
+            .values_list('namespace', flat=True)
+        )
+        namespaces.update(
+            models.Event.objects.using(self.database)
+            .filter(app_name__in=local_namespaces)
+            .values_list('app_name', flat=True)
+            .distinct()
+        )
+
+        # The namespaces of the tasks linked to events are read once as the distinct prefixes of task names up to the
+        # first dot, and intersected with the local namespaces here, which keeps the query independent of their number.
+        if len(local_namespaces - namespaces) > 0:
+            rows = (
+                models.Task.objects.using(self.database)
+                .filter(event__isnull=False)
+                .annotate(dot_position=StrIndex('name', Value('.')))
+                .annotate(namespace=Case(
+                    When(dot_position__gt=0, then=Substr('name', 1, F('dot_position') - 1)),
+                    default=F('name')
+                ))
+                .values_list('namespace', flat=True)
+                .distinct()
+            )
+            namespaces.update(rows.iterator(chunk_size=LOOKUP_CHUNK_SIZE))
+
+        return sorted(namespaces & local_namespaces)
+
+    @contextmanager
+    def instrument(self, operation):
+        """
+        Sends the backend_operation signal with the duration and number of queries of the block. The block may set the
+        number of rows it read or changed in the yielded dict.
+        """
+        stats = {'rows': None}
+        if not signals.backend_operation.has_listeners(self.__class__):
+            yield stats
+            return
+
+        query_count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        started_on = time.perf_counter()
+        with ExitStack() as stack:
+            for database in {self.database, self.read_database}:
+                stack.enter_context(connections[database].execute_wrapper(count_query))
+            yield stats
+
+        signals.backend_operation.send(
+            sender=self.__class__,
+            backend=self,
+            operation=operation,
+            duration=time.perf_counter() - started_on,
+            queries=query_count,
+            rows=stats['rows']
+        )
 
-    def _convert_backend_events_to_events(self, backend_events):
+    def sync_local_events(self):
+        with self.instrument('sync_local_events'), self._syncing():
+            super().sync_local_events()
+
+    def sync_remote_events(self):
+        with self.instrument('sync_remote_events'), self._syncing():
+            super().sync_remote_events()
+
+    @contextmanager
+    def _syncing(self):
+        self._sync_depth += 1
+        try:
+            yield
+        finally:
+            self._sync_depth -= 1
+            if self._sync_depth == 0:
+                self._sync_updated_ons = None
+
+    def _event_lookups(self, events):
+        """
+        Yields Q objects that together match the given events. Event names are grouped by app name so that each Q is
+        a short OR of `event_name__in` lookups covering at most LOOKUP_CHUNK_SIZE events.
+        """
+        from django_celery_events import utils
+
+        event_names = defaultdict(set)
+        for event in events:
+            event_names[event.app_name].add(event.event_name)
+
+        lookup, lookup_size = None, 0
+        for app_name, names in event_names.items():
+            for names_chunk in utils.chunked(sorted(names), LOOKUP_CHUNK_SIZE):
+                if lookup_size + len(names_chunk) > LOOKUP_CHUNK_SIZE:
+                    yield lookup
+                    lookup, lookup_size = None, 0
+
+                q = Q(app_name=app_name, event_name__in=names_chunk)
+                lookup = q if lookup is None else lookup | q
+                lookup_size += len(names_chunk)
+
+        if lookup is not None:
+            yield lookup
+
+    def _convert_rows_to_events(self, rows):
+        """
+        Builds events from rows of (event pk, app name, event name, event updated on, task pk, task name, task queue)
+        ordered by event pk, as returned by a join of the events with their tasks. The backend_obj of the events and
+        tasks only hold the fields read, and load their model instance when another attribute is needed.
+        """
         events = []
-        for backend_event in backend_events:
-            event = Event.local_instance(backend_event.app_name, backend_event.event_name)
-            event.backend_obj = backend_event
+        backend_tasks = {}
+        event = None
+        for event_pk, app_name, event_name, updated_on, task_pk, task_name, task_queue in rows:
+            if event is None or event.backend_obj.pk != event_pk:
+                event = Event.local_instance(app_name, event_name)
+                event.backend_obj = BackendEventRef(event_pk, updated_on, using=self.database)
+                events.append(event)
 
-            for backend_task in backend_event.tasks.all():
-                task = Task.local_instance(backend_task.name, queue=backend_task.queue, use_routes=False)
-                task.backend_obj = backend_task
+            if task_pk is not None:
+                backend_task = backend_tasks.get(task_pk)
+                if backend_task is None:
+                    backend_task = backend_tasks[task_pk] = BackendTaskRef(
+                        task_pk, task_name, task_queue, using=self.database
+                    )
 
+                task = Task.local_instance(task_name, queue=task_queue, use_routes=False)
+                task.backend_obj = backend_task
                 event.add_task(task)
 
-            events.append(event)
-
         return events
 
+    def _event_rows_queryset(self, queryset):
+        return queryset.values_list(
+            'pk', 'app_name', 'event_name', 'updated_on', 'tasks__pk', 'tasks__name', 'tasks__queue'
+        ).order_by('pk')
+
+    def _event_routes_queryset(self, queryset):
+        return queryset.values_list('pk', 'app_name', 'event_name', 'updated_on', 'routes').order_by('pk')
+
+    def _expand_routes(self, rows):
+        """
+        Converts rows of (event pk, app name, event name, event updated on, routes) to the rows of a join of the events
+        with their tasks.
+        """
+        for event_pk, app_name, event_name, updated_on, routes in rows:
+            if len(routes) == 0:
+                yield event_pk, app_name, event_name, updated_on, None, None, None
+            for task_pk, task_name, task_queue in routes:
+                yield event_pk, app_name, event_name, updated_on, task_pk, task_name, task_queue
+
+    def _event_rows(self, queryset):
+        from django_celery_events import configs
+
+        if configs.get_routes_snapshot():
+            return self._expand_routes(self._event_routes_queryset(queryset).iterator())
+
+        return self._event_rows_queryset(queryset).iterator()
+
+    async def _aevent_rows(self, queryset):
+        from django_celery_events import configs
+
+        if configs.get_routes_snapshot():
+            return list(self._expand_routes([row async for row in self._event_routes_queryset(queryset)]))
+
+        return [row async for row in self._event_rows_queryset(queryset)]
+
     def commit_changes(self, events_to_create=None, events_to_delete=None, events_to_update=None):
-        with transaction.atomic():
-            super().commit_changes(
-                events_to_create=events_to_create,
-                events_to_delete=events_to_delete,
-                events_to_update=events_to_update
+        # The per event methods called by the base implementation only collect changes, which are then applied to
+        # all events at once. In dry run mode, they are kept in planned_changes instead.
+        self._changes = _ChangeSet()
+        try:
+            with self.instrument('commit_changes') as stats, transaction.atomic(using=self.database):
+                super().commit_changes(
+                    events_to_create=events_to_create,
+                    events_to_delete=events_to_delete,
+                    events_to_update=events_to_update
+                )
+                if self.dry_run:
+                    self.planned_changes.append(self._changes)
+                else:
+                    with self.instrument('apply_changes') as apply_stats:
+                        apply_stats['rows'] = len(self._changes)
+                        self._apply_changes(self._changes)
+                stats['rows'] = len(self._changes)
+        finally:
+            self._changes = None
+            self._sync_updated_ons = None
+
+    def get_changed_namespaces(self, fingerprints):
+        """
+        Returns the local namespaces whose fingerprint differs from the one stored at their last sync, or whose local
+        events, or remote events with their tasks, were created, updated or deleted in the backend since then.
+        """
+        return sorted(self.get_namespace_changes(fingerprints))
+
+    def get_namespace_changes(self, fingerprints):
+        """
+        Returns a dict of the changed local namespaces, as for get_changed_namespaces(), to the (app_name, event_name)
+        keys of the remote events that changed since their last sync, or to None if the fingerprint or the local events
+        of the namespace changed and the namespace needs a full sync.
+        """
+        with self.instrument('get_changed_namespaces') as stats:
+            stats['rows'] = len(fingerprints)
+            return self._get_namespace_changes(fingerprints)
+
+    def _get_namespace_changes(self, fingerprints):
+        from django_celery_events import models, utils
+
+        local_namespaces = set(self.get_local_namespaces())
+        stored_fingerprints, watermarks = {}, {}
+        rows = (
+            models.NamespaceFingerprint.objects.using(self.database)
+            .filter(namespace__in=local_namespaces)
+            .values_list('namespace', 'fingerprint', 'routing_version', 'updated_on')
+        )
+        for namespace, fingerprint, routing_version, updated_on in rows:
+            stored_fingerprints[namespace] = fingerprint
+            watermarks[namespace] = (routing_version, updated_on)
+
+        changes = {
+            namespace: None
+            for namespace in set(fingerprints) | set(stored_fingerprints)
+            if fingerprints.get(namespace) != stored_fingerprints.get(namespace)
+        }
+
+        if len(watermarks) > 0:
+            # Events changed since the last sync of a namespace are the events and tombstones of deleted events with a
+            # greater routing version than the one the sync saw, or updated after the sync ended.
+            min_version = min(version for version, _ in watermarks.values())
+            min_synced_on = min(synced_on for _, synced_on in watermarks.values())
+            querysets = (
+                (models.Event.objects.using(self.database), 'updated_on'),
+                (models.EventTombstone.objects.using(self.database), 'deleted_on'),
             )
 
-    def fetch_events_for_namespaces(self, namespaces):
+            # Local events of a namespace changed or deleted since its last sync, e.g. in the admin, are restored from
+            # the registry by a full sync of the namespace.
+            namespaces = sorted(namespace for namespace in watermarks if changes.get(namespace, ()) is not None)
+            for queryset, changed_on_field in querysets:
+                for namespaces_chunk in utils.chunked(namespaces, LOOKUP_CHUNK_SIZE):
+                    rows = (
+                        queryset
+                        .filter(app_name__in=namespaces_chunk)
+                        .filter(Q(routing_version__gt=min_version) | Q(**{changed_on_field + '__gt': min_synced_on}))
+                        .values_list('app_name', 'routing_version', changed_on_field)
+                    )
+                    for namespace, routing_version, changed_on in rows:
+                        version, synced_on = watermarks[namespace]
+                        if routing_version > version or changed_on > synced_on:
+                            changes[namespace] = None
+
+            remote_events = {(event.app_name, event.event_name): event for event in self.registry.remote_events}
+            for queryset, changed_on_field in querysets:
+                for lookup in self._event_lookups(remote_events.values()):
+                    rows = (
+                        queryset
+                        .filter(lookup)
+                        .filter(Q(routing_version__gt=min_version) | Q(**{changed_on_field + '__gt': min_synced_on}))
+                        .values_list('app_name', 'event_name', 'routing_version', changed_on_field)
+                    )
+                    for app_name, event_name, routing_version, changed_on in rows:
+                        for task in remote_events[(app_name, event_name)].tasks:
+                            namespace = self.get_task_namespace(task)
+                            if namespace not in watermarks or (namespace in changes and changes[namespace] is None):
+                                continue
+
+                            version, synced_on = watermarks[namespace]
+                            if routing_version > version or changed_on > synced_on:
+                                changes.setdefault(namespace, set()).add((app_name, event_name))
+
+        return changes
+
+    def get_routing_version(self):
+        return get_routing_version(using=self.database) or 0
+
+    def _bump_routing_version(self):
+        self.routing_version_bumps += 1
+        return bump_routing_version(using=self.database)
+
+    @contextmanager
+    def sync_lock(self, timeout=None):
+        """
+        Holds a database lock that serializes syncs across processes: an advisory lock on PostgreSQL, or a lease row
+        that expires after SYNC_LOCK_LEASE on other databases and is extended by renew_sync_lock(). Must be used outside
+        of transactions. Raises TimeoutError if the lock is not acquired within timeout seconds.
+        """
         from django_celery_events import models
 
-        return self._convert_backend_events_to_events(
-            models.Event.objects.filter(app_name__in=namespaces).prefetch_related('tasks')
-        )
+        owner = uuid.uuid4().hex
+        connection = connections[self.database]
+        locks = models.SyncLock.objects.using(self.database)
+
+        def try_acquire():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_try_advisory_lock(%s)', [SYNC_LOCK_ADVISORY_KEY])
+                    return cursor.fetchone()[0]
+
+            now = timezone.now()
+            lease = {'owner': owner, 'expires_on': now + SYNC_LOCK_LEASE}
+            if locks.filter(name=SYNC_LOCK_NAME, expires_on__lte=now).update(**lease) > 0:
+                return True
+
+            try:
+                with transaction.atomic(using=self.database):
+                    locks.create(name=SYNC_LOCK_NAME, **lease)
+                return True
+            except IntegrityError:
+                return False
+
+        def release():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [SYNC_LOCK_ADVISORY_KEY])
+            else:
+                locks.filter(name=SYNC_LOCK_NAME, owner=owner).delete()
+
+        started_on = time.monotonic()
+        while not try_acquire():
+            if timeout is not None and time.monotonic() - started_on >= timeout:
+                raise TimeoutError('Sync lock not acquired within {0} seconds.'.format(timeout))
+            time.sleep(SYNC_LOCK_POLL_INTERVAL)
+
+        if connection.vendor != 'postgresql':
+            self._sync_lock_owner = owner
+        try:
+            yield
+        finally:
+            self._sync_lock_owner = None
+            release()
+
+    def renew_sync_lock(self):
+        """
+        Extends the lease of the sync lock held by sync_lock() by SYNC_LOCK_LEASE. Raises TimeoutError if the lease
+        expired and was taken by another process. Does nothing if the lock is an advisory lock or is not held.
+        """
+        from django_celery_events import models
+
+        if self._sync_lock_owner is None:
+            return
+
+        renewed = models.SyncLock.objects.using(self.database).filter(
+            name=SYNC_LOCK_NAME,
+            owner=self._sync_lock_owner
+        ).update(expires_on=timezone.now() + SYNC_LOCK_LEASE)
+        if renewed == 0:
+            raise TimeoutError('Sync lock lease expired and was taken by another process.')
+
+    def get_namespace_remote_event_keys(self):
+        """
+        Returns the (app_name, event_name) keys of the remote events of the registry by local namespace with tasks on
+        them, in the registry or in the backend.
+        """
+        local_namespaces = set(self.get_local_namespaces())
+        remote_events = list(self.registry.remote_events)
+        with self._syncing():
+            backend_events = self.fetch_events(remote_events)
+
+        keys = defaultdict(set)
+        for event in remote_events + list(backend_events):
+            for task in event.tasks:
+                namespace = self.get_task_namespace(task)
+                if namespace in local_namespaces:
+                    keys[namespace].add((event.app_name, event.event_name))
+
+        return keys
+
+    def store_namespace_fingerprints(self, fingerprints, namespaces, routing_version=0):
+        """
+        Stores the fingerprints of namespaces, with the routing version that their sync saw all changes up to.
+        """
+        from django_celery_events import models
+
+        fingerprint_objs = models.NamespaceFingerprint.objects.using(self.database)
+        with self.instrument('store_namespace_fingerprints') as stats, transaction.atomic(using=self.database):
+            stats['rows'] = len(namespaces)
+            fingerprint_objs.filter(namespace__in=namespaces).delete()
+            fingerprint_objs.bulk_create([
+                models.NamespaceFingerprint(
+                    namespace=namespace,
+                    fingerprint=fingerprints[namespace],
+                    routing_version=routing_version
+                )
+                for namespace in namespaces
+                if namespace in fingerprints
+            ])
+
+    def fetch_events_for_namespaces(self, namespaces):
+        with self.instrument('fetch_events_for_namespaces') as stats:
+            backend_events = self._fetch_events_for_namespaces(namespaces)
+            stats['rows'] = len(backend_events)
+
+        return backend_events
 
     def fetch_events(self, events):
+        with self.instrument('fetch_events') as stats:
+            backend_events = self._fetch_events(events)
+            stats['rows'] = len(backend_events)
+
+        return backend_events
+
+    def _fetch_events_for_namespaces(self, namespaces):
         from django_celery_events import models
 
-        if len(events) > 0:
-            qs = [Q(app_name=event.app_name, event_name=event.event_name) for event in events]
-            ored_qs = None
-            for q in qs:
-                if ored_qs is None:
-                    ored_qs = q
-                else:
-                    ored_qs |= q
+        event_objs = models.Event.objects.using(self.get_read_database())
+        return self._convert_rows_to_events(self._event_rows(event_objs.filter(app_name__in=namespaces)))
 
-            return self._convert_backend_events_to_events(
-                models.Event.objects.filter(ored_qs).prefetch_related('tasks')
-            )
-        else:
-            return []
+    def _fetch_events(self, events):
+        from django_celery_events import models
 
-    def should_update_event(self, event):
+        event_objs = models.Event.objects.using(self.get_read_database())
+        backend_events = []
+        for lookup in self._event_lookups(events):
+            backend_events.extend(self._convert_rows_to_events(self._event_rows(event_objs.filter(lookup))))
+
+        return backend_events
+
+    async def afetch_events_for_namespaces(self, namespaces):
         from django_celery_events import models
 
-        if event.backend_obj is None:
-            return True
+        event_objs = models.Event.objects.using(self.get_read_database())
+        return self._convert_rows_to_events(await self._aevent_rows(event_objs.filter(app_name__in=namespaces)))
 
-        try:
-            backend_event = models.Event.objects.get(app_name=event.app_name, event_name=event.event_name)
-            return backend_event.updated_on > event.backend_obj.updated_on
-        except models.Event.DoesNotExist:
-            return False
+    async def afetch_events(self, events):
+        from django_celery_events import models
 
-    def delete_events(self, events):
+        event_objs = models.Event.objects.using(self.get_read_database())
+        backend_events = []
+        for lookup in self._event_lookups(events):
+            backend_events.extend(self._convert_rows_to_events(await self._aevent_rows(event_objs.filter(lookup))))
+
+        return backend_events
+
+    async def async_sync_local_events(self):
+        await sync_to_async(self.sync_local_events)()
+
+    async def async_sync_remote_events(self):
+        await sync_to_async(self.sync_remote_events)()
+
+    def should_update_event(self, event):
+        return self.should_update_events([event])[0]
+
+    def should_update_events(self, events):
+        """
+        Batched version of should_update_event. Returns a list of booleans in the same order as events, reading the
+        backend timestamps of all events in one query per LOOKUP_CHUNK_SIZE events.
+        """
+        updated_ons = self._get_updated_ons([event for event in events if event.backend_obj is not None])
+        results = []
+        for event in events:
+            if event.backend_obj is None:
+                results.append(True)
+            else:
+                updated_on = updated_ons.get((event.app_name, event.event_name))
+                results.append(updated_on is not None and updated_on > event.backend_obj.updated_on)
+
+        return results
+
+    def _get_updated_ons(self, events):
+        """
+        Returns the backend timestamps of events by (app_name, event_name), None for the events not in the backend.
+        While syncing, the timestamps of all the events of the registry are read on first use and kept until the next
+        commit, so that the per event checks of a sync share one query per LOOKUP_CHUNK_SIZE events.
+        """
+        if self._sync_depth == 0:
+            return self._read_updated_ons(events)
+
+        if self._sync_updated_ons is None:
+            self._sync_updated_ons = self._read_updated_ons(self.registry.events)
+
+        missing_events = [
+            event for event in events if (event.app_name, event.event_name) not in self._sync_updated_ons
+        ]
+        if len(missing_events) > 0:
+            self._sync_updated_ons.update(self._read_updated_ons(missing_events))
+
+        return self._sync_updated_ons
+
+    def _read_updated_ons(self, events):
         from django_celery_events import models
 
-        backend_event_pks = [event.backend_obj.pk for event in events]
-        models.Event.objects.filter(pk__in=backend_event_pks).delete()
+        updated_ons = {(event.app_name, event.event_name): None for event in events}
+        event_objs = models.Event.objects.using(self.get_read_database())
+        for lookup in self._event_lookups(events):
+            rows = event_objs.filter(lookup).values_list('app_name', 'event_name', 'updated_on')
+            for app_name, event_name, updated_on in rows:
+                updated_ons[(app_name, event_name)] = updated_on
+
+        return updated_ons
+
+    def update_local_events(self, events):
+        """
+        Updates the local events that are out of date with the backend, checking staleness of all events at once.
+        """
+        for event, should_update in zip(events, self.should_update_events(events)):
+            if should_update:
+                self.update_local_event(event)
+
+    def delete_events(self, events):
+        with self.instrument('delete_events') as stats, self._collect_changes() as changes:
+            stats['rows'] = len(events)
+            changes.events_to_delete.extend(events)
 
     def create_events(self, events):
+        with self.instrument('create_events') as stats, self._collect_changes() as changes:
+            stats['rows'] = len(events)
+            changes.events_to_create.extend(events)
+
+    def create_tasks(self, event, tasks):
+        with self.instrument('create_tasks') as stats, self._collect_changes() as changes:
+            stats['rows'] = len(tasks)
+            changes.tasks_to_create.extend((event, task) for task in tasks)
+
+    def remove_tasks(self, event, tasks):
+        with self.instrument('remove_tasks') as stats, self._collect_changes() as changes:
+            stats['rows'] = len(tasks)
+            changes.tasks_to_remove.extend((event, task) for task in tasks)
+
+    def update_tasks(self, event, tasks):
+        with self.instrument('update_tasks') as stats, self._collect_changes() as changes:
+            stats['rows'] = len(tasks)
+            changes.tasks_to_update.extend((event, task) for task in tasks)
+
+    @contextmanager
+    def _collect_changes(self):
+        """
+        Yields the change set of the commit_changes call in progress. Outside of commit_changes, the changes are
+        applied as soon as the block exits.
+        """
+        if self._changes is not None:
+            yield self._changes
+        else:
+            changes = _ChangeSet()
+            yield changes
+            with transaction.atomic(using=self.database):
+                self._apply_changes(changes)
+
+    def _apply_changes(self, changes):
+        """
+        Applies a change set with a fixed number of bulk queries per LOOKUP_CHUNK_SIZE rows, regardless of the number
+        of events it touches.
+        """
         from django_celery_events import models, utils
 
-        backend_events = utils.bulk_create_with_ids([
-            models.Event(app_name=event.app_name, event_name=event.event_name)
-            for event in events
-        ])
-        for event, backend_event in zip(events, backend_events):
+        event_objs = models.Event.objects.using(self.database)
+        event_task_objs = models.Event.tasks.through.objects.using(self.database)
+        EventTask = models.Event.tasks.through
+
+        # The routing version is bumped first, so that the row lock it takes orders the commits of concurrent changes
+        # by version, and every changed event is stamped with the version of its change.
+        if len(changes) == 0:
+            return
+        routing_version = self._bump_routing_version()
+
+        # Events
+        backend_events = utils.bulk_create_with_ids(
+            [
+                models.Event(app_name=event.app_name, event_name=event.event_name, routing_version=routing_version)
+                for event in changes.events_to_create
+            ],
+            unique_fields=('app_name', 'event_name'),
+            using=self.database
+        )
+        for event, backend_event in zip(changes.events_to_create, backend_events):
             event.backend_obj = backend_event
 
-    def create_tasks(self, event, tasks):
+        deleted_event_pks = {event.backend_obj.pk for event in changes.events_to_delete}
+        for pks_chunk in utils.chunked(deleted_event_pks, LOOKUP_CHUNK_SIZE):
+            event_objs.filter(pk__in=pks_chunk).delete()
+        models.EventTombstone.objects.using(self.database).bulk_create(
+            [
+                models.EventTombstone(
+                    app_name=event.app_name,
+                    event_name=event.event_name,
+                    routing_version=routing_version
+                )
+                for event in changes.events_to_delete
+            ],
+            batch_size=LOOKUP_CHUNK_SIZE
+        )
+
+        tasks_to_create = [(e, t) for e, t in changes.tasks_to_create if e.backend_obj.pk not in deleted_event_pks]
+        tasks_to_remove = [(e, t) for e, t in changes.tasks_to_remove if e.backend_obj.pk not in deleted_event_pks]
+        tasks_to_update = [(e, t) for e, t in changes.tasks_to_update if e.backend_obj.pk not in deleted_event_pks]
+
+        # Tasks are shared between events. The queue of a task is changed in place only if the task is used by no
+        # event other than the one updating it and there is no task with the new queue yet. Otherwise the event is
+        # linked to the task with the new queue.
+        updated_backend_task_pks = [task.backend_obj.pk for _, task in tasks_to_update]
+        event_counts = defaultdict(int)
+        for pks_chunk in utils.chunked(set(updated_backend_task_pks), LOOKUP_CHUNK_SIZE):
+            rows = event_task_objs.filter(task_id__in=pks_chunk).values_list('task_id', flat=True)
+            for task_pk in rows:
+                event_counts[task_pk] += 1
+        update_counts = Counter(updated_backend_task_pks)
+        claimed_keys = {
+            (name, queue or '')
+            for name, queue in self._fetch_backend_tasks({(task.name, task.queue) for _, task in tasks_to_update})
+        }
+
+        backend_tasks_to_update = []
+        for event, task in tasks_to_update:
+            pk, key = task.backend_obj.pk, (task.name, task.queue or '')
+            if event_counts[pk] <= 1 and update_counts[pk] == 1 and key not in claimed_keys:
+                claimed_keys.add(key)
+                backend_tasks_to_update.append(models.Task(pk=pk, queue=task.queue))
+            else:
+                tasks_to_remove.append((event, task))
+                tasks_to_create.append((event, task))
+
+        if len(backend_tasks_to_update) > 0:
+            bulk_update(backend_tasks_to_update, update_fields=['queue'], using=self.database)
+
+        # Links between events and tasks
+        links_to_remove = {(event.backend_obj.pk, task.backend_obj.pk) for event, task in tasks_to_remove}
+        link_pks_to_remove = []
+        for links_chunk in utils.chunked(links_to_remove, LOOKUP_CHUNK_SIZE):
+            rows = event_task_objs.filter(
+                event_id__in={event_pk for event_pk, _ in links_chunk},
+                task_id__in={task_pk for _, task_pk in links_chunk}
+            ).values_list('pk', 'event_id', 'task_id')
+            link_pks_to_remove.extend(pk for pk, event_pk, task_pk in rows if (event_pk, task_pk) in links_to_remove)
+        for pks_chunk in utils.chunked(link_pks_to_remove, LOOKUP_CHUNK_SIZE):
+            event_task_objs.filter(pk__in=pks_chunk).delete()
+
+        backend_tasks = self._get_or_create_backend_tasks([task for _, task in tasks_to_create])
+        links_to_add = set()
+        for event, task in tasks_to_create:
+            task.backend_obj = backend_tasks[(task.name, task.queue)]
+            links_to_add.add((event.backend_obj.pk, task.backend_obj.pk))
+        event_task_objs.bulk_create(
+            [EventTask(event_id=event_pk, task_id=task_pk) for event_pk, task_pk in links_to_add],
+            batch_size=LOOKUP_CHUNK_SIZE,
+            ignore_conflicts=True
+        )
+
+        # Touch the updated events so that other processes know that their tasks changed
+        updated_events = {
+            event.backend_obj.pk: event
+            for event, _ in tasks_to_create + tasks_to_remove + tasks_to_update
+        }
+        updated_on = timezone.now()
+        for pks_chunk in utils.chunked(updated_events, LOOKUP_CHUNK_SIZE):
+            event_objs.filter(pk__in=pks_chunk).update(updated_on=updated_on, routing_version=routing_version)
+        for event in updated_events.values():
+            event.backend_obj.updated_on = updated_on
+        refresh_event_routes(updated_events, using=self.database)
+
+        self._delete_orphaned_backend_tasks({task_pk for _, task_pk in links_to_remove})
+
+        transaction.on_commit(routing_cache.invalidate, using=self.database)
+
+    def dump_events(self, namespaces=None):
+        """
+        Yields (app_name, event_name, [[task_name, queue], ...]) for the events of the backend, or of the given
+        namespaces, streaming the rows of a join of the events with their tasks.
+        """
+        from django_celery_events import models
+
+        event_objs = models.Event.objects.using(self.get_read_database())
+        if namespaces is not None:
+            event_objs = event_objs.filter(app_name__in=namespaces)
+
+        rows = event_objs.values_list('pk', 'app_name', 'event_name', 'tasks__name', 'tasks__queue').order_by('pk')
+        for _, event_rows in groupby(rows.iterator(chunk_size=LOOKUP_CHUNK_SIZE), key=lambda row: row[0]):
+            event_rows = list(event_rows)
+            yield (
+                event_rows[0][1],
+                event_rows[0][2],
+                [[task_name, task_queue] for _, _, _, task_name, task_queue in event_rows if task_name is not None]
+            )
+
+    def load_events(self, records, chunk_size=None):
+        """
+        Adds (app_name, event_name, [[task_name, queue], ...]) records to the backend, creating the missing events and
+        tasks and linking them. Existing links are kept. records are consumed in chunks of chunk_size, each written in
+        its own transaction with a fixed number of bulk queries. Returns the numbers of events and created events.
+        """
         from django_celery_events import models, utils
 
-        backend_tasks = utils.bulk_create_with_ids([
-            models.Task(name=task.name, queue=task.queue)
-            for task in tasks
-        ])
-        for task, backend_task in zip(tasks, backend_tasks):
-            task.backend_obj = backend_task
+        event_objs = models.Event.objects.using(self.database)
+        event_task_objs = models.Event.tasks.through.objects.using(self.database)
+        EventTask = models.Event.tasks.through
 
-        event.backend_obj.tasks.add(*backend_tasks)
-        event.backend_obj.save()
+        event_count, created_event_count = 0, 0
+        for records_chunk in utils.chunked(records, chunk_size or LOOKUP_CHUNK_SIZE):
+            with transaction.atomic(using=self.database):
+                routing_version = self._bump_routing_version()
+                keys = {(app_name, event_name) for app_name, event_name, _ in records_chunk}
+                event_pks = {}
+                for lookup in self._event_lookups([Event.local_instance(*key) for key in keys]):
+                    rows = event_objs.filter(lookup).values_list('app_name', 'event_name', 'pk')
+                    event_pks.update(((app_name, event_name), pk) for app_name, event_name, pk in rows)
 
-    def remove_tasks(self, event, tasks):
+                missing_keys = sorted(keys - event_pks.keys())
+                created_events = utils.bulk_create_with_ids(
+                    [
+                        models.Event(app_name=app_name, event_name=event_name, routing_version=routing_version)
+                        for app_name, event_name in missing_keys
+                    ],
+                    unique_fields=('app_name', 'event_name'),
+                    using=self.database
+                )
+                event_pks.update(((event.app_name, event.event_name), event.pk) for event in created_events)
+
+                task_keys = {(name, queue) for _, _, tasks in records_chunk for name, queue in tasks}
+                backend_tasks = self._get_or_create_backend_tasks([
+                    Task.local_instance(name, queue=queue, use_routes=False) for name, queue in task_keys
+                ])
+                links = {
+                    (event_pks[(app_name, event_name)], backend_tasks[(name, queue)].pk)
+                    for app_name, event_name, tasks in records_chunk
+                    for name, queue in tasks
+                }
+                event_task_objs.bulk_create(
+                    [EventTask(event_id=event_pk, task_id=task_pk) for event_pk, task_pk in links],
+                    batch_size=LOOKUP_CHUNK_SIZE,
+                    ignore_conflicts=True
+                )
+
+                # Touch the events with tasks so that other processes reload them
+                updated_event_pks = {event_pk for event_pk, _ in links}
+                for pks_chunk in utils.chunked(updated_event_pks, LOOKUP_CHUNK_SIZE):
+                    event_objs.filter(pk__in=pks_chunk).update(
+                        updated_on=timezone.now(),
+                        routing_version=routing_version
+                    )
+                refresh_event_routes(updated_event_pks, using=self.database)
+                transaction.on_commit(routing_cache.invalidate, using=self.database)
+
+            event_count += len(keys)
+            created_event_count += len(created_events)
+
+        return event_count, created_event_count
+
+    def prune(self, namespaces=None, older_than=None, batch_size=None, dry_run=False, lock_timeout=None):
+        """
+        Deletes the tasks linked to no event, and the events of namespaces that have no task on any event and are in
+        namespaces, or were neither synced nor changed for the older_than timedelta. Events are only deleted if either
+        is given, as a namespace without events in the registry of this process may still be owned by another service.
+        The fingerprints of the pruned namespaces are deleted as well, so that an owner still running recreates its
+        events on its next sync. Rows are deleted in transactions of at most batch_size rows while holding the sync
+        lock, waited for at most lock_timeout seconds. Returns the numbers of tasks and events deleted, or that would be
+        deleted in dry run mode.
+        """
         from django_celery_events import models
 
-        backend_tasks = [models.Task(pk=task.backend_obj.pk) for task in tasks]
-        event.backend_obj.tasks.remove(*backend_tasks)
-        event.backend_obj.save()
+        if dry_run:
+            event_objs = models.Event.objects.using(self.database).filter(
+                app_name__in=self._get_prunable_namespaces(namespaces, older_than),
+                tasks__isnull=True
+            )
+            return models.Task.objects.using(self.database).filter(event__isnull=True).count(), event_objs.count()
 
-    def update_tasks(self, event, tasks):
+        with self.sync_lock(timeout=lock_timeout):
+            namespaces = self._get_prunable_namespaces(namespaces, older_than)
+            event_objs = models.Event.objects.using(self.database).filter(app_name__in=namespaces, tasks__isnull=True)
+            task_objs = models.Task.objects.using(self.database).filter(event__isnull=True)
+            event_count = self._delete_in_batches(event_objs, batch_size or LOOKUP_CHUNK_SIZE)
+            task_count = self._delete_in_batches(task_objs, batch_size or LOOKUP_CHUNK_SIZE)
+            models.NamespaceFingerprint.objects.using(self.database).filter(namespace__in=namespaces).delete()
+
+            # Tombstones are only needed until every namespace synced past them
+            min_version = models.NamespaceFingerprint.objects.using(self.database).aggregate(
+                min_version=Min('routing_version')
+            )['min_version']
+            tombstone_objs = models.EventTombstone.objects.using(self.database)
+            if min_version is not None:
+                tombstone_objs = tombstone_objs.filter(routing_version__lte=min_version)
+            self._delete_in_batches(tombstone_objs, batch_size or LOOKUP_CHUNK_SIZE)
+
+            if event_count > 0:
+                bump_routing_version(using=self.database)
+                routing_cache.invalidate()
+                self._namespaces_pruned(namespaces)
+
+        return task_count, event_count
+
+    def _get_prunable_namespaces(self, namespaces, older_than):
+        """
+        Returns the namespaces whose events prune() deletes: those without tasks on their events and without events in
+        the registry, restricted to namespaces if given, and to the namespaces neither synced nor changed for
+        older_than if given. Returns no namespace if neither is given.
+        """
         from django_celery_events import models
 
-        backend_tasks = [models.Task(pk=task.backend_obj.pk, queue=task.queue) for task in tasks]
-        bulk_update(backend_tasks, update_fields=['queue'])
-        event.backend_obj.save()
+        if namespaces is None and older_than is None:
+            return set()
+
+        registry_namespaces = set(event.app_name for event in self.registry.events)
+        event_objs = models.Event.objects.using(self.database)
+        prunable_namespaces = set(
+            event_objs.values('app_name')
+            .annotate(task_count=Count('tasks'))
+            .filter(task_count=0)
+            .values_list('app_name', flat=True)
+        ) - registry_namespaces
+
+        if namespaces is not None:
+            prunable_namespaces &= set(namespaces)
+
+        if older_than is not None:
+            active_on = timezone.now() - older_than
+            prunable_namespaces -= set(
+                event_objs.filter(updated_on__gt=active_on).values_list('app_name', flat=True).distinct()
+            )
+            prunable_namespaces -= set(
+                models.NamespaceFingerprint.objects.using(self.database)
+                .filter(updated_on__gt=active_on)
+                .values_list('namespace', flat=True)
+            )
+
+        return prunable_namespaces
+
+    def _namespaces_pruned(self, namespaces):
+        """
+        Called after prune() deleted the events of namespaces.
+        """
+
+    def _delete_in_batches(self, queryset, batch_size):
+        count = 0
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if len(pks) == 0:
+                return count
+
+            with transaction.atomic(using=self.database):
+                count += queryset.filter(pk__in=pks).delete()[1].get(queryset.model._meta.label, 0)
+            self.renew_sync_lock()
+
+    def _fetch_backend_tasks(self, keys):
+        """
+        Returns the existing backend tasks for the given (name, queue) keys, keyed by (name, queue). A null queue and
+        an empty queue match the same backend task, as they do in the unique constraint of tasks.
+        """
+        from django_celery_events import models, utils
+
+        keys_by_lookup = defaultdict(list)
+        for name, queue in keys:
+            keys_by_lookup[(name, queue or '')].append((name, queue))
+        names = sorted({name for name, _ in keys})
+        backend_tasks = {}
+        for names_chunk in utils.chunked(names, LOOKUP_CHUNK_SIZE):
+            for backend_task in models.Task.objects.using(self.database).filter(name__in=names_chunk).order_by('pk'):
+                for key in keys_by_lookup.get((backend_task.name, backend_task.queue or ''), []):
+                    backend_tasks.setdefault(key, backend_task)
+
+        return backend_tasks
+
+    def _get_or_create_backend_tasks(self, tasks):
+        """
+        Returns the backend tasks for the given tasks keyed by (name, queue), creating the missing ones in bulk. Tasks
+        created concurrently by another process are ignored on insert and read back with the others.
+        """
+        from django_celery_events import configs, models
+
+        keys = {(task.name, task.queue) for task in tasks}
+        backend_tasks = self._fetch_backend_tasks(keys)
+
+        missing_keys = sorted(keys - backend_tasks.keys(), key=lambda k: (k[0], k[1] or ''))
+        if len(missing_keys) > 0:
+            models.Task.objects.using(self.database).bulk_create(
+                [models.Task(name=name, queue=queue) for name, queue in missing_keys],
+                batch_size=configs.get_bulk_batch_size(),
+                ignore_conflicts=True
+            )
+            backend_tasks.update(self._fetch_backend_tasks(missing_keys))
+
+        return backend_tasks
+
+    def _delete_orphaned_backend_tasks(self, backend_task_pks):
+        from django_celery_events import models, utils
+
+        for pks_chunk in utils.chunked(backend_task_pks, LOOKUP_CHUNK_SIZE):
+            models.Task.objects.using(self.database).filter(pk__in=pks_chunk, event__isnull=True).delete()
+
+
+class DjangoCacheBackend(DjangoDBBackend):
+    """
+    Database backend that serves fetches from Django's cache framework. The events of each namespace are cached as one
+    blob of rows, read from the database on a cache miss and rewritten after every commit that touches the namespace.
+    The cache is set by EVENTS_CACHE, and the timeout of the blobs by EVENTS_CACHE_TIMEOUT.
+    """
+
+    def _get_cache(self):
+        from django_celery_events import configs
+
+        return caches[configs.get_cache()]
+
+    def _get_cache_key(self, namespace):
+        return 'django_celery_events:routing:' + namespace
+
+    def _get_namespace_rows(self, namespaces):
+        """
+        Returns the event rows of each namespace, reading the namespaces missing from the cache from the database.
+        """
+        namespaces = set(namespaces)
+        cache = self._get_cache()
+        blobs = cache.get_many([self._get_cache_key(namespace) for namespace in namespaces])
+        namespace_rows = {
+            namespace: blobs[self._get_cache_key(namespace)]
+            for namespace in namespaces
+            if self._get_cache_key(namespace) in blobs
+        }
+
+        missing_namespaces = namespaces - namespace_rows.keys()
+        if len(missing_namespaces) > 0:
+            namespace_rows.update(self._load_namespace_rows(missing_namespaces))
+
+        return namespace_rows
+
+    def _load_namespace_rows(self, namespaces, using=None):
+        from django_celery_events import configs, models
+
+        namespace_rows = {namespace: [] for namespace in namespaces}
+        event_objs = models.Event.objects.using(using or self.get_read_database())
+        for row in self._event_rows(event_objs.filter(app_name__in=namespaces)):
+            namespace_rows[row[1]].append(row)
+
+        self._get_cache().set_many(
+            {self._get_cache_key(namespace): rows for namespace, rows in namespace_rows.items()},
+            timeout=configs.get_cache_timeout()
+        )
+        return namespace_rows
+
+    async def _aget_namespace_rows(self, namespaces):
+        namespaces = set(namespaces)
+        cache = self._get_cache()
+        blobs = await cache.aget_many([self._get_cache_key(namespace) for namespace in namespaces])
+        namespace_rows = {
+            namespace: blobs[self._get_cache_key(namespace)]
+            for namespace in namespaces
+            if self._get_cache_key(namespace) in blobs
+        }
+
+        missing_namespaces = namespaces - namespace_rows.keys()
+        if len(missing_namespaces) > 0:
+            namespace_rows.update(await self._aload_namespace_rows(missing_namespaces))
+
+        return namespace_rows
+
+    async def _aload_namespace_rows(self, namespaces):
+        from django_celery_events import configs, models
+
+        namespace_rows = {namespace: [] for namespace in namespaces}
+        event_objs = models.Event.objects.using(self.get_read_database())
+        for row in await self._aevent_rows(event_objs.filter(app_name__in=namespaces)):
+            namespace_rows[row[1]].append(row)
+
+        await self._get_cache().aset_many(
+            {self._get_cache_key(namespace): rows for namespace, rows in namespace_rows.items()},
+            timeout=configs.get_cache_timeout()
+        )
+        return namespace_rows
+
+    def _namespace_rows_to_events(self, namespace_rows, keys=None):
+        rows = sorted(
+            (row for rows in namespace_rows.values() for row in rows if keys is None or (row[1], row[2]) in keys),
+            key=lambda row: row[0]
+        )
+        return self._convert_rows_to_events(rows)
+
+    def _fetch_events_for_namespaces(self, namespaces):
+        # Syncs compute their changes from the database, as cached rows may lag behind it
+        if self._sync_depth > 0:
+            return super()._fetch_events_for_namespaces(namespaces)
+
+        return self._namespace_rows_to_events(self._get_namespace_rows(namespaces))
+
+    def _fetch_events(self, events):
+        if self._sync_depth > 0:
+            return super()._fetch_events(events)
+
+        keys = set((event.app_name, event.event_name) for event in events)
+        return self._namespace_rows_to_events(self._get_namespace_rows(app_name for app_name, _ in keys), keys)
+
+    async def afetch_events_for_namespaces(self, namespaces):
+        return self._namespace_rows_to_events(await self._aget_namespace_rows(namespaces))
+
+    async def afetch_events(self, events):
+        keys = set((event.app_name, event.event_name) for event in events)
+        return self._namespace_rows_to_events(await self._aget_namespace_rows(app_name for app_name, _ in keys), keys)
+
+    def load_events(self, records, chunk_size=None):
+        namespaces = set()
+
+        def iter_records():
+            for record in records:
+                namespaces.add(record[0])
+                yield record
+
+        counts = super().load_events(iter_records(), chunk_size=chunk_size)
+        self._get_cache().delete_many([self._get_cache_key(namespace) for namespace in namespaces])
+        return counts
+
+    def _namespaces_pruned(self, namespaces):
+        self._get_cache().delete_many([self._get_cache_key(namespace) for namespace in namespaces])
+
+    def _apply_changes(self, changes):
+        super()._apply_changes(changes)
+
+        namespaces = set(event.app_name for event in changes.events_to_create + changes.events_to_delete)
+        for tasks in (changes.tasks_to_create, changes.tasks_to_remove, changes.tasks_to_update):
+            namespaces.update(event.app_name for event, _ in tasks)
+
+        # Rebuilt from the database written to, as a replica may not have the changes yet when the transaction commits
+        if len(namespaces) > 0:
+            transaction.on_commit(
+                lambda: self._load_namespace_rows(namespaces, using=self.database),
+                using=self.database
+            )
+
+
+class BackendRef:
+    """
+    Stand-in for a model instance built from the fields read by the backend. Other attributes are read from the model
+    instance, which is loaded on first use from the database `using` of the backend, EVENTS_DATABASE by default.
+    """
+    __slots__ = ('pk', 'using', '_instance')
+    model_name = None
+
+    def __init__(self, pk, using=None):
+        self.pk = pk
+        self.using = using
+        self._instance = None
+
+    @property
+    def model(self):
+        return apps.get_model('django_celery_events', self.model_name)
+
+    @property
+    def instance(self):
+        if self._instance is None:
+            from django_celery_events import configs
+
+            self._instance = self.model.objects.using(self.using or configs.get_database()).get(pk=self.pk)
+        return self._instance
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (BackendRef, Model)):
+            return self.model is other._meta.concrete_model and self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __repr__(self):
+        return '<{0}: {1}>'.format(self.__class__.__name__, self.pk)
+
+    @property
+    def _meta(self):
+        return self.model._meta
+
+
+class BackendEventRef(BackendRef):
+    __slots__ = ('updated_on',)
+    model_name = 'Event'
+
+    def __init__(self, pk, updated_on, using=None):
+        super().__init__(pk, using=using)
+        self.updated_on = updated_on
+
+
+class BackendTaskRef(BackendRef):
+    __slots__ = ('name', 'queue')
+    model_name = 'Task'
+
+    def __init__(self, pk, name, queue, using=None):
+        super().__init__(pk, using=using)
+        self.name = name
+        self.queue = queue
+
+
+class _ChangeSet:
+    """
+    Changes to the backend collected by DjangoDBBackend during commit_changes.
+    """
+
+    def __init__(self):
+        self.events_to_create = []
+        self.events_to_delete = []
+        self.tasks_to_create = []
+        self.tasks_to_remove = []
+        self.tasks_to_update = []
+
+    def __len__(self):
+        return (
+            len(self.events_to_create) + len(self.events_to_delete) + len(self.tasks_to_create) +
+            len(self.tasks_to_remove) + len(self.tasks_to_update)
+        )
+
+    def describe(self):
+        """
+        Returns a line for every change, e.g. `+ app.event` for an event to create or `app.event: ~ app.task (queue)`
+        for a task to update.
+        """
+        lines = []
+        for sign, events in (('+', self.events_to_create), ('-', self.events_to_delete)):
+            for event in events:
+                lines.append('{0} {1}.{2}'.format(sign, event.app_name, event.event_name))
+
+        for sign, tasks in (('+', self.tasks_to_create), ('-', self.tasks_to_remove), ('~', self.tasks_to_update)):
+            for event, task in tasks:
+                lines.append('{0}.{1}: {2} {3}{4}'.format(
+                    event.app_name,
+                    event.event_name,
+                    sign,
+                    task.name,
+                    ' ({0})'.format(task.queue) if task.queue else ''
+                ))
+
+        return lines
+
+
+def get_routing_version(using=None):
+    from django_celery_events import configs, models
+
+    versions = models.RoutingVersion.objects.using(using or configs.get_read_database())
+    return versions.filter(pk=1).values_list('version', flat=True).first()
+
+
+def bump_routing_version(using=None):
+    from django_celery_events import configs, models
+
+    versions = models.RoutingVersion.objects.using(using or configs.get_database())
+    if versions.filter(pk=1).update(version=F('version') + 1) == 0:
+        versions.get_or_create(pk=1, defaults={'version': 1})
+
+    return versions.filter(pk=1).values_list('version', flat=True).first()
+
+
+def refresh_event_routes(event_pks, using=None):
+    """
+    Rewrites the routes snapshot of the events with the given primary keys from their tasks, with two queries per
+    LOOKUP_CHUNK_SIZE events.
+    """
+    from django_celery_events import configs, models, utils
+
+    event_objs = models.Event.objects.using(using or configs.get_database())
+    for pks_chunk in utils.chunked(event_pks, LOOKUP_CHUNK_SIZE):
+        routes = {pk: [] for pk in pks_chunk}
+        rows = event_objs.filter(pk__in=pks_chunk, tasks__isnull=False).values_list(
+            'pk', 'tasks__pk', 'tasks__name', 'tasks__queue'
+        ).order_by('pk', 'tasks__name', 'tasks__pk')
+        for event_pk, task_pk, task_name, task_queue in rows:
+            routes[event_pk].append([task_pk, task_name, task_queue])
+
+        event_objs.bulk_update(
+            [
+                models.Event(pk=pk, routes=event_routes, routes_version=F('routes_version') + 1)
+                for pk, event_routes in routes.items()
+            ],
+            ['routes', 'routes_version']
+        )
+
+
+def touch_events(event_pks, using=None):
+    """
+    Marks the events with the given primary keys as changed by a write made outside of the backend, e.g. in the admin:
+    bumps the routing version, stamps it and the current time on the events and rewrites their routes snapshot, so
+    that the routing cache, cached rows, incremental syncs and staleness checks see the change.
+    """
+    from django_celery_events import configs, models, utils
+
+    using = using or configs.get_database()
+    routing_version = bump_routing_version(using=using)
+    updated_on = timezone.now()
+    event_objs = models.Event.objects.using(using)
+    namespaces = set()
+    for pks_chunk in utils.chunked(event_pks, LOOKUP_CHUNK_SIZE):
+        namespaces.update(event_objs.filter(pk__in=pks_chunk).values_list('app_name', flat=True).distinct())
+        event_objs.filter(pk__in=pks_chunk).update(updated_on=updated_on, routing_version=routing_version)
+    refresh_event_routes(event_pks, using=using)
+    transaction.on_commit(lambda: _routing_changed(namespaces, using), using=using)
+
+
+def tombstone_events(event_keys, using=None):
+    """
+    Records the deletion of the events with the given (app_name, event_name) keys by a write made outside of the
+    backend, e.g. in the admin, so that incremental syncs, the routing cache and cached rows see it.
+    """
+    from django_celery_events import configs, models
+
+    using = using or configs.get_database()
+    routing_version = bump_routing_version(using=using)
+    models.EventTombstone.objects.using(using).bulk_create(
+        [
+            models.EventTombstone(app_name=app_name, event_name=event_name, routing_version=routing_version)
+            for app_name, event_name in event_keys
+        ],
+        batch_size=LOOKUP_CHUNK_SIZE
+    )
+    namespaces = set(app_name for app_name, _ in event_keys)
+    transaction.on_commit(lambda: _routing_changed(namespaces, using), using=using)
+
+
+def _routing_changed(namespaces, using):
+    """
+    Invalidates the routing cache and, when the configured backend is a DjangoCacheBackend, rebuilds the cached rows of
+    the given namespaces from the database written to.
+    """
+    from django_celery_events import configs, registry
+
+    routing_cache.invalidate()
+    backend_class = configs.get_backend_class()
+    if backend_class is not None and issubclass(backend_class, DjangoCacheBackend) and len(namespaces) > 0:
+        backend_class(registry)._load_namespace_rows(namespaces, using=using)
+
+
+class RoutingCache:
+    """
+    In-process map of (app_name, event_name) to the (name, queue) pairs of the tasks of the event in the backend. The
+    map is reloaded only when the routing version of the backend changed. The version is checked on every lookup, or
+    at most once every ttl seconds when ttl, or else the EVENTS_ROUTING_CACHE_TTL setting, is set.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.version = None
+        self.routes = {}
+        self.checked_on = None
+
+    def get_tasks(self, app_name, event_name):
+        self.refresh()
+        return self.routes.get((app_name, event_name), ())
+
+    def refresh(self):
+        from django_celery_events import configs
+
+        ttl = self.ttl if self.ttl is not None else configs.get_routing_cache_ttl()
+        now = time.monotonic()
+        if ttl is not None and self.checked_on is not None and now - self.checked_on < ttl:
+            return
+
+        version = get_routing_version()
+        if version is None or version != self.version:
+            self.routes = self.load_routes()
+            self.version = version
+        self.checked_on = now
+
+    def load_routes(self):
+        from django_celery_events import configs, models
+
+        event_objs = models.Event.objects.using(configs.get_read_database())
+        if configs.get_routes_snapshot():
+            return {
+                (app_name, event_name): tuple((task_name, task_queue) for _, task_name, task_queue in event_routes)
+                for app_name, event_name, event_routes in event_objs.values_list(
+                    'app_name', 'event_name', 'routes'
+                ).iterator()
+            }
+
+        routes = defaultdict(list)
+        rows = event_objs.values_list('app_name', 'event_name', 'tasks__name', 'tasks__queue')
+        for app_name, event_name, task_name, task_queue in rows.iterator():
+            tasks = routes[(app_name, event_name)]
+            if task_name is not None:
+                tasks.append((task_name, task_queue))
+
+        return {key: tuple(tasks) for key, tasks in routes.items()}
+
+    def invalidate(self):
+        self.version = None
+        self.checked_on = None
+
+
+routing_cache = RoutingCache()
@@ -1,6 +1,8 @@
 import importlib
 
 from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import DEFAULT_DB_ALIAS
 
 
 def _import_class(path):
@@ -43,3 +45,43 @@ def get_backend_class():
         return _import_class(backend_class_path)
 
     return None
+
+
+def get_bulk_batch_size():
+    return getattr(settings, 'EVENTS_BULK_BATCH_SIZE', None)
+
+
+def get_routing_cache_ttl():
+    return getattr(settings, 'EVENTS_ROUTING_CACHE_TTL', None)
+
+
+def get_events_manifest():
+    return getattr(settings, 'EVENTS_MANIFEST', None)
+
+
+def get_cache():
+    cache = getattr(settings, 'EVENTS_CACHE', None)
+    return cache if cache else 'default'
+
+
+def get_cache_timeout():
+    return getattr(settings, 'EVENTS_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def get_publish_chunk_size():
+    chunk_size = getattr(settings, 'EVENTS_PUBLISH_CHUNK_SIZE', None)
+    return chunk_size if chunk_size else 500
+
+
+def get_database():
+    database = getattr(settings, 'EVENTS_DATABASE', None)
+    return database if database else DEFAULT_DB_ALIAS
+
+
+def get_read_database():
+    database = getattr(settings, 'EVENTS_READ_DATABASE', None)
+    return database if database else get_database()
+
+
+def get_routes_snapshot():
+    return bool(getattr(settings, 'EVENTS_ROUTES_SNAPSHOT', False))
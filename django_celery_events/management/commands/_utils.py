@@ -0,0 +1,20 @@
+from django.core.management import CommandError
+
+from django_celery_events import registry, configs
+from django_celery_events.backends import DjangoDBBackend
+
+
+def get_db_backend(database=None):
+    """
+    Returns an instance of the configured backend, using database for reads and writes if given. Raises CommandError if
+    the backend is not a DjangoDBBackend.
+    """
+    backend_class = configs.get_backend_class()
+    if backend_class is None or not issubclass(backend_class, DjangoDBBackend):
+        raise CommandError('EVENTS_BACKEND is not a DjangoDBBackend.')
+
+    backend = backend_class(registry)
+    if database:
+        backend.database = backend.read_database = database
+
+    return backend
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand, CommandError
+
+from django_celery_events import registry, configs, manifest
+
+
+class Command(BaseCommand):
+    help = 'Writes a manifest of the events and tasks of the project, loaded on startup when EVENTS_MANIFEST is set.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Path of the manifest. Defaults to EVENTS_MANIFEST.')
+
+    def handle(self, *args, **options):
+        path = options.get('path') or configs.get_events_manifest()
+        if not path:
+            raise CommandError('No manifest path given and EVENTS_MANIFEST is not set.')
+
+        manifest.write_manifest(registry, path)
+        self.stdout.write(self.style.SUCCESS('Events manifest written to {0}.'.format(path)))
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management import BaseCommand
+
+from django_celery_events.management.commands._utils import get_db_backend
+
+
+class Command(BaseCommand):
+    help = 'Writes the events and tasks of the backend as lines of JSON, loaded by loadevents.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_names', nargs='*', help='App names of the events to dump. Defaults to all events.')
+        parser.add_argument('--output', help='File to write the events to. Defaults to stdout.')
+        parser.add_argument('--database', help='Database to read the events from. Defaults to EVENTS_READ_DATABASE.')
+
+    def handle(self, *args, **options):
+        backend = get_db_backend(options.get('database'))
+        namespaces = options.get('app_names') or None
+
+        if options.get('output'):
+            with open(options['output'], 'w') as f:
+                count = self.dump(backend, namespaces, f)
+            self.stdout.write(self.style.SUCCESS('{0} events dumped to {1}.'.format(count, options['output'])))
+
+        else:
+            self.dump(backend, namespaces, self.stdout)
+
+    def dump(self, backend, namespaces, output):
+        count = 0
+        for app_name, event_name, tasks in backend.dump_events(namespaces):
+            output.write(json.dumps(
+                {'app_name': app_name, 'event_name': event_name, 'tasks': tasks},
+                separators=(',', ':')
+            ) + '\n')
+            count += 1
+
+        return count
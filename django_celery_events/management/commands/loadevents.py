@@ -0,0 +1,43 @@
+import json
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+from django_celery_events.management.commands._utils import get_db_backend
+
+
+class Command(BaseCommand):
+    help = 'Adds the events and tasks written by dumpevents to the backend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='File to read the events from. Defaults to stdin.')
+        parser.add_argument('--database', help='Database to load the events into. Defaults to EVENTS_DATABASE.')
+        parser.add_argument('--chunk-size', type=int, help='Number of events written per transaction.')
+
+    def handle(self, *args, **options):
+        backend = get_db_backend(options.get('database'))
+
+        if options.get('path'):
+            with open(options['path']) as f:
+                event_count, created_event_count = backend.load_events(
+                    self.iter_records(f), chunk_size=options.get('chunk_size')
+                )
+        else:
+            event_count, created_event_count = backend.load_events(
+                self.iter_records(sys.stdin), chunk_size=options.get('chunk_size')
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            '{0} events loaded, {1} created.'.format(event_count, created_event_count)
+        ))
+
+    def iter_records(self, lines):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+                yield record['app_name'], record['event_name'], [tuple(task) for task in record.get('tasks', [])]
+            except (ValueError, KeyError, TypeError) as e:
+                raise CommandError('Invalid event on line {0}: {1}'.format(line_number, e))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+
+from django_celery_events.management.commands._utils import get_db_backend
+
+
+class Command(BaseCommand):
+    help = 'Deletes the tasks linked to no event, and the events without tasks of the given or inactive apps.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_labels',
+            nargs='*',
+            help='Labels of the apps whose events without tasks are deleted, e.g. decommissioned apps.'
+        )
+        parser.add_argument(
+            '--older-than-days',
+            type=float,
+            help='Delete the events without tasks of the apps neither synced nor changed for this number of days.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the numbers of rows that would be deleted without deleting them.'
+        )
+        parser.add_argument('--batch-size', type=int, help='Maximum number of rows deleted per transaction.')
+        parser.add_argument(
+            '--lock-timeout',
+            type=float,
+            help='Seconds to wait for the sync lock before failing. Waits indefinitely by default.'
+        )
+        parser.add_argument('--database', help='Database to prune. Defaults to EVENTS_DATABASE.')
+
+    def handle(self, *args, **options):
+        backend = get_db_backend(options.get('database'))
+        older_than_days = options.get('older_than_days')
+        try:
+            task_count, event_count = backend.prune(
+                namespaces=options.get('app_labels') or None,
+                older_than=timedelta(days=older_than_days) if older_than_days is not None else None,
+                batch_size=options.get('batch_size'),
+                dry_run=options.get('dry_run', False),
+                lock_timeout=options.get('lock_timeout')
+            )
+        except TimeoutError as e:
+            raise CommandError(str(e))
+
+        if options.get('dry_run', False):
+            self.stdout.write(self.style.NOTICE(
+                'Dry run, {0} tasks and {1} events would be deleted.'.format(task_count, event_count)
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('{0} tasks and {1} events deleted.'.format(task_count, event_count)))
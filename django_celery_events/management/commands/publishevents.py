@@ -0,0 +1,74 @@
+import json
+import sys
+
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+
+from django_celery_events import registry, publishing
+
+
+class Command(BaseCommand):
+    help = 'Publishes an event for every object of a model or every line of JSON kwargs, in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_name', help='App name of the event.')
+        parser.add_argument('event_name', help='Name of the event.')
+        parser.add_argument(
+            '--model',
+            help='Model, as app_label.ModelName, whose objects are published. Reads JSON kwargs lines otherwise.'
+        )
+        parser.add_argument('--field', default='pk', help='Field of the model passed to the event. Defaults to pk.')
+        parser.add_argument('--kwarg', help='Name of the kwarg the field is passed as. Defaults to the field name.')
+        parser.add_argument('--input', help='File of JSON kwargs, one object per line. Defaults to stdin.')
+        parser.add_argument('--chunk-size', type=int, help='Events per message. Defaults to EVENTS_PUBLISH_CHUNK_SIZE.')
+        parser.add_argument('--rate-limit', type=float, help='Maximum number of messages per second.')
+
+    def handle(self, *args, **options):
+        event = self.get_event(options['app_name'], options['event_name'])
+
+        if options.get('model'):
+            count = self.publish(event, self.iter_model_kwargs(
+                options['model'],
+                options.get('field') or 'pk',
+                options.get('kwarg') or options.get('field') or 'pk',
+                options.get('chunk_size')
+            ), options)
+
+        elif options.get('input'):
+            with open(options['input']) as f:
+                count = self.publish(event, self.iter_json_kwargs(f), options)
+
+        else:
+            count = self.publish(event, self.iter_json_kwargs(sys.stdin), options)
+
+        self.stdout.write(self.style.SUCCESS('{0} events published.'.format(count)))
+
+    def publish(self, event, kwargs_iterable, options):
+        return publishing.publish_many(
+            event,
+            kwargs_iterable,
+            chunk_size=options.get('chunk_size'),
+            rate_limit=options.get('rate_limit')
+        )
+
+    def get_event(self, app_name, event_name):
+        for event in registry.events:
+            if event.app_name == app_name and event.event_name == event_name:
+                return event
+
+        raise CommandError('Event {0}.{1} is not in the registry.'.format(app_name, event_name))
+
+    def iter_model_kwargs(self, model_label, field, kwarg, chunk_size):
+        try:
+            model = apps.get_model(model_label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        values = model._default_manager.order_by('pk').values_list(field, flat=True)
+        for value in values.iterator(chunk_size=chunk_size or 2000):
+            yield {kwarg: value}
+
+    def iter_json_kwargs(self, lines):
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
@@ -1,11 +1,54 @@
-from django.core.management import BaseCommand
+from contextlib import contextmanager
 
-from django_celery_events import registry, configs
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from django_celery_events import registry, configs, signals
+from django_celery_events.backends import BaseDjangoBackend, DjangoDBBackend
 
 
 class Command(BaseCommand):
     help = 'Syncs events with backend.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_labels',
+            nargs='*',
+            help='Labels of the apps to sync. Defaults to the apps with events or tasks.'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Sync even if no event or task changed since the last sync.'
+        )
+        parser.add_argument(
+            '--dry-run', '--diff',
+            action='store_true',
+            dest='dry_run',
+            help='Print the changes that would be made without writing them.'
+        )
+        parser.add_argument(
+            '--lock',
+            action='store_true',
+            help='Hold a database lock during the sync and commit each app in its own transaction, so that concurrent '
+                 'syncs run one after the other.'
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=float,
+            help='Seconds to wait for the lock before failing. Waits indefinitely by default.'
+        )
+        parser.add_argument(
+            '--database',
+            help='Database to sync events in. Defaults to EVENTS_DATABASE.'
+        )
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Print the time, number of queries and number of rows of each backend operation.'
+        )
+
     def handle(self, *args, **options):
         backend_class = configs.get_backend_class()
 
@@ -14,6 +57,149 @@ class Command(BaseCommand):
 
         else:
             backend = backend_class(registry)
+            if options.get('profile', False):
+                with self.profile():
+                    self.sync(backend, options)
+            else:
+                self.sync(backend, options)
+
+    def sync(self, backend, options):
+        if isinstance(backend, DjangoDBBackend) and options.get('database'):
+            backend.database = backend.read_database = options['database']
+
+        if isinstance(backend, BaseDjangoBackend):
+            backend.scope(self.get_namespaces(backend, options.get('app_labels') or []))
+
+        if isinstance(backend, DjangoDBBackend) and options.get('lock', False):
+            try:
+                with backend.sync_lock(timeout=options.get('lock_timeout')):
+                    self.sync_with_fingerprints(
+                        backend,
+                        options.get('force', False),
+                        options.get('dry_run', False),
+                        per_namespace=True
+                    )
+            except TimeoutError as e:
+                raise CommandError(str(e))
+
+        elif isinstance(backend, DjangoDBBackend):
+            self.sync_with_fingerprints(backend, options.get('force', False), options.get('dry_run', False))
+
+        else:
             backend.sync_local_events()
             backend.sync_remote_events()
             self.stdout.write(self.style.SUCCESS('Events synced!'))
+
+    @contextmanager
+    def profile(self):
+        """
+        Collects the backend_operation signals sent within the block and prints, for every operation, the number of
+        calls, the total time, queries and rows. Times and queries of nested operations are included in their callers.
+        """
+        operations = {}
+
+        def receiver(operation, duration, queries, rows, **kwargs):
+            stats = operations.setdefault(operation, [0, 0.0, 0, 0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] += queries
+            stats[3] += rows or 0
+
+        signals.backend_operation.connect(receiver, weak=False, dispatch_uid='syncevents_profile')
+        try:
+            yield
+        finally:
+            signals.backend_operation.disconnect(dispatch_uid='syncevents_profile')
+
+        self.stdout.write('{0:<32}{1:>8}{2:>12}{3:>10}{4:>10}'.format(
+            'Operation', 'Calls', 'Time (ms)', 'Queries', 'Rows'
+        ))
+        for operation, (calls, duration, queries, rows) in sorted(operations.items(), key=lambda item: -item[1][1]):
+            self.stdout.write('{0:<32}{1:>8}{2:>12.1f}{3:>10}{4:>10}'.format(
+                operation, calls, duration * 1000, queries, rows
+            ))
+
+    def get_namespaces(self, backend, app_labels):
+        for app_label in app_labels:
+            try:
+                apps.get_app_config(app_label)
+            except LookupError as e:
+                raise CommandError(str(e))
+
+        return app_labels if len(app_labels) > 0 else backend.get_registry_namespaces()
+
+    def sync_with_fingerprints(self, backend, force, dry_run, per_namespace=False):
+        backend.dry_run = dry_run
+        with backend.instrument('get_namespace_fingerprints') as stats:
+            fingerprints = backend.get_namespace_fingerprints()
+            stats['rows'] = len(fingerprints)
+        changes = {namespace: None for namespace in backend.get_local_namespaces()}
+
+        if not force:
+            changes = backend.get_namespace_changes(fingerprints)
+            if len(changes) == 0:
+                self.stdout.write(self.style.SUCCESS('No changes since the last sync. Nothing is done.'))
+                return
+
+        namespaces = sorted(changes)
+        full_namespaces = [namespace for namespace in namespaces if changes[namespace] is None]
+        remote_event_keys = set().union(*(keys for keys in changes.values() if keys is not None))
+
+        if per_namespace:
+            # Full syncs of single namespaces only sync the remote events with tasks of the namespace, found for all
+            # namespaces at once, rather than every remote event each time
+            namespace_remote_event_keys = backend.get_namespace_remote_event_keys() if full_namespaces else {}
+            for namespace in namespaces:
+                with transaction.atomic(using=backend.database):
+                    if changes[namespace] is None:
+                        self.sync_namespaces(
+                            backend, [namespace], fingerprints, dry_run,
+                            remote_event_keys=namespace_remote_event_keys.get(namespace, set())
+                        )
+                    else:
+                        self.sync_namespaces(
+                            backend, [namespace], fingerprints, dry_run,
+                            sync_local=False,
+                            remote_event_keys=changes[namespace]
+                        )
+                    backend.renew_sync_lock()
+
+        else:
+            if len(full_namespaces) > 0:
+                self.sync_namespaces(backend, full_namespaces, fingerprints, dry_run)
+            incremental_namespaces = [namespace for namespace in namespaces if changes[namespace] is not None]
+            if len(incremental_namespaces) > 0:
+                self.sync_namespaces(
+                    backend, incremental_namespaces, fingerprints, dry_run,
+                    sync_local=False,
+                    remote_event_keys=remote_event_keys
+                )
+
+        if dry_run:
+            lines = [line for changes in backend.planned_changes for line in changes.describe()]
+            for line in lines:
+                self.stdout.write(line)
+            self.stdout.write(self.style.NOTICE('Dry run, {0} changes not written.'.format(len(lines))))
+
+        else:
+            self.stdout.write(self.style.SUCCESS('Events synced: {0}.'.format(', '.join(namespaces))))
+
+    def sync_namespaces(self, backend, namespaces, fingerprints, dry_run, sync_local=True, remote_event_keys=None):
+        """
+        Syncs the local events of namespaces if sync_local, and their tasks on all remote events, or on the remote
+        events with remote_event_keys if given, and stores their fingerprints. The routing version stored with them is
+        the one at the end of the sync if it only moved by the changes of the sync, and the one at its start otherwise,
+        since changes committed by other processes during the sync may not have been seen.
+        """
+        started_version = backend.get_routing_version()
+        started_bumps = backend.routing_version_bumps
+        backend.scope(namespaces, remote_event_keys=remote_event_keys)
+        if sync_local:
+            backend.sync_local_events()
+        backend.sync_remote_events()
+
+        if not dry_run:
+            routing_version = backend.get_routing_version()
+            if routing_version - started_version != backend.routing_version_bumps - started_bumps:
+                routing_version = started_version
+            backend.store_namespace_fingerprints(fingerprints, namespaces, routing_version=routing_version)
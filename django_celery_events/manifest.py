@@ -0,0 +1,110 @@
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+
+from celery_events.events import Task
+
+from django.conf import settings
+
+
+def get_registry_hash():
+    """
+    Returns a hash of what the registry is built from: the installed apps, the task routes and the source of the events
+    module of every app. Changes to task modules or to the code of routes are not detected.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(list(settings.INSTALLED_APPS)).encode())
+    digest.update(repr(getattr(settings, 'CELERY_TASK_ROUTES', None)).encode())
+    for app in settings.INSTALLED_APPS:
+        try:
+            spec = importlib.util.find_spec(app + '.events')
+        except (ImportError, ValueError):
+            spec = None
+
+        if spec is not None and spec.origin and os.path.isfile(spec.origin):
+            digest.update(app.encode())
+            with open(spec.origin, 'rb') as f:
+                digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def build_manifest(registry):
+    local_events = set((event.app_name, event.event_name) for event in registry.local_events)
+    return {
+        'hash': get_registry_hash(),
+        'events': [
+            [
+                event.app_name,
+                event.event_name,
+                (event.app_name, event.event_name) in local_events,
+                [[task.name, task.queue] for task in event.tasks]
+            ]
+            for event in registry.events
+        ]
+    }
+
+
+def write_manifest(registry, path):
+    with open(path, 'w') as f:
+        json.dump(build_manifest(registry), f, separators=(',', ':'))
+
+
+def read_manifest(path):
+    """
+    Returns the manifest at path, or None if it cannot be read, is not a manifest or was built from a different
+    registry.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('events'), list):
+        return None
+
+    if manifest.get('hash') != get_registry_hash():
+        return None
+
+    return manifest
+
+
+def load_manifest(registry, manifest):
+    """
+    Adds the events and tasks of manifest to registry. Tasks are added by name, so task modules are not imported.
+    Events declared again afterwards, e.g. when application code imports an events module, are the events of the
+    manifest rather than new events.
+    """
+    events = {}
+    for app_name, event_name, is_local, tasks in manifest['events']:
+        if is_local:
+            event = registry.create_local_event(app_name, event_name)
+        else:
+            event = registry.remote_event(app_name, event_name)
+
+        for task_name, queue in tasks:
+            event.add_task(Task.local_instance(task_name, queue=queue, use_routes=False))
+        events[(app_name, event_name)] = event
+
+    registry_events = registry.events
+    registry.create_local_event = _get_manifest_event(registry, registry_events, events, registry.create_local_event)
+    registry.remote_event = _get_manifest_event(registry, registry_events, events, registry.remote_event)
+
+
+def _get_manifest_event(registry, registry_events, events, declare_event):
+    """
+    Wraps declare_event so that it returns the event of the manifest with the same app name and event name, as long as
+    the events of the registry were not replaced since the manifest was loaded.
+    """
+    @functools.wraps(declare_event)
+    def get_or_declare_event(app_name, event_name, *args, **kwargs):
+        event = events.get((app_name, event_name))
+        if event is None or registry.events is not registry_events:
+            return declare_event(app_name, event_name, *args, **kwargs)
+
+        return event
+
+    return get_or_declare_event
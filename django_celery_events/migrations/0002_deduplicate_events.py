@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def deduplicate_events(apps, schema_editor):
+    """
+    Merges events with the same app name and event name into the oldest of them, keeping the union of their tasks.
+    """
+    Event = apps.get_model('django_celery_events', 'Event')
+    db_alias = schema_editor.connection.alias
+
+    duplicates = (
+        Event.objects.using(db_alias)
+        .values('app_name', 'event_name')
+        .annotate(event_count=Count('id'), min_id=Min('id'))
+        .filter(event_count__gt=1)
+    )
+    for duplicate in duplicates:
+        event = Event.objects.using(db_alias).get(pk=duplicate['min_id'])
+        other_events = Event.objects.using(db_alias).filter(
+            app_name=duplicate['app_name'],
+            event_name=duplicate['event_name']
+        ).exclude(pk=event.pk)
+
+        task_ids = set(
+            Event.tasks.through.objects.using(db_alias)
+            .filter(event__in=other_events)
+            .values_list('task_id', flat=True)
+        )
+        event.tasks.add(*task_ids)
+        other_events.delete()
+
+
+# Kept apart from the schema changes of 0003_event_unique_task_index, as PostgreSQL does not alter a table with
+# pending deferred foreign key checks in the same transaction.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0002_deduplicate_events'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(
+                fields=('app_name', 'event_name'),
+                name='dce_event_app_name_event_name_uniq'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['name', 'queue'], name='dce_task_name_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.models import Count, Min, Value
+from django.db.models.functions import Coalesce
+
+
+def deduplicate_tasks(apps, schema_editor):
+    """
+    Merges tasks with the same name and queue into the oldest of them, moving their events over to it. A null queue
+    and an empty queue count as the same queue.
+    """
+    Task = apps.get_model('django_celery_events', 'Task')
+    EventTask = apps.get_model('django_celery_events', 'Event').tasks.through
+    db_alias = schema_editor.connection.alias
+
+    duplicates = (
+        Task.objects.using(db_alias)
+        .annotate(queue_key=Coalesce('queue', Value('')))
+        .values('name', 'queue_key')
+        .annotate(task_count=Count('id'), min_id=Min('id'))
+        .filter(task_count__gt=1)
+    )
+    for duplicate in duplicates:
+        task_id = duplicate['min_id']
+        other_tasks = Task.objects.using(db_alias).annotate(
+            queue_key=Coalesce('queue', Value(''))
+        ).filter(
+            name=duplicate['name'],
+            queue_key=duplicate['queue_key']
+        ).exclude(pk=task_id)
+
+        linked_event_ids = set(
+            EventTask.objects.using(db_alias).filter(task_id=task_id).values_list('event_id', flat=True)
+        )
+        event_ids = set(
+            EventTask.objects.using(db_alias).filter(task__in=other_tasks).values_list('event_id', flat=True)
+        )
+        EventTask.objects.using(db_alias).bulk_create([
+            EventTask(event_id=event_id, task_id=task_id)
+            for event_id in event_ids - linked_event_ids
+        ])
+        other_tasks.delete()
+
+
+# Kept apart from the schema changes of 0005_task_unique, as PostgreSQL does not alter a table with pending deferred
+# foreign key checks in the same transaction.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0003_event_unique_task_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0004_deduplicate_tasks'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='dce_task_name_queue_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(
+                models.F('name'), Coalesce('queue', models.Value('')), name='dce_task_name_queue_uniq'
+            ),
+        ),
+    ]
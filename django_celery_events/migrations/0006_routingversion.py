@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+def create_routing_version(apps, schema_editor):
+    RoutingVersion = apps.get_model('django_celery_events', 'RoutingVersion')
+    RoutingVersion.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0005_task_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoutingVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_routing_version, migrations.RunPython.noop),
+    ]
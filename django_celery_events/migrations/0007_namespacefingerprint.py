@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0006_routingversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NamespaceFingerprint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=255, unique=True)),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+def populate_routes(apps, schema_editor):
+    """
+    Writes the routes snapshot of the events with tasks, 500 events at a time.
+    """
+    Event = apps.get_model('django_celery_events', 'Event')
+    db_alias = schema_editor.connection.alias
+
+    event_ids = list(Event.objects.using(db_alias).filter(tasks__isnull=False).distinct().values_list('pk', flat=True))
+    for i in range(0, len(event_ids), 500):
+        routes = {event_id: [] for event_id in event_ids[i:i + 500]}
+        rows = (
+            Event.objects.using(db_alias)
+            .filter(pk__in=routes.keys(), tasks__isnull=False)
+            .values_list('pk', 'tasks__pk', 'tasks__name', 'tasks__queue')
+            .order_by('pk', 'tasks__name', 'tasks__pk')
+        )
+        for event_id, task_id, name, queue in rows:
+            routes[event_id].append([task_id, name, queue])
+
+        Event.objects.using(db_alias).bulk_update(
+            [Event(pk=event_id, routes=event_routes, routes_version=1) for event_id, event_routes in routes.items()],
+            ['routes', 'routes_version']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0009_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='routes',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='routes_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_routes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0010_event_routes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='routing_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='namespacefingerprint',
+            name='routing_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='EventTombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=255)),
+                ('event_name', models.CharField(max_length=255)),
+                ('routing_version', models.PositiveIntegerField(default=0)),
+                ('deleted_on', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['app_name', 'event_name'], name='dce_tombstone_app_event_idx'),
+                ],
+            },
+        ),
+    ]
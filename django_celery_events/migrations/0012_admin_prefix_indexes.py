@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_events', '0011_incremental_sync'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='dce_task_queue_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='dce_event_event_name_idx',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='queue',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='app_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='event_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
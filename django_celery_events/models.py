@@ -1,22 +1,99 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 
 
 class Task(models.Model):
-    name = models.CharField(max_length=255)
-    queue = models.CharField(max_length=255, null=True, blank=True)
+    # Indexed for the prefix searches of the admin, which PostgreSQL serves with the extra "_like" index of the fields
+    name = models.CharField(max_length=255, db_index=True)
+    queue = models.CharField(max_length=255, null=True, blank=True, db_index=True)
     updated_on = models.DateTimeField(auto_now=True)
     created_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Tasks are shared between events. The queue is coalesced so that tasks without a queue are unique too.
+        constraints = [
+            models.UniqueConstraint(
+                models.F('name'), Coalesce('queue', models.Value('')), name='dce_task_name_queue_uniq'
+            ),
+        ]
+
     def __str__(self):
         return self.name + ((' - ' + self.queue) if self.queue else '')
 
 
 class Event(models.Model):
-    app_name = models.CharField(max_length=255)
-    event_name = models.CharField(max_length=255)
+    # Indexed for the prefix searches of the admin, as the fields of tasks
+    app_name = models.CharField(max_length=255, db_index=True)
+    event_name = models.CharField(max_length=255, db_index=True)
     tasks = models.ManyToManyField(Task, blank=True)
+    # Snapshot of the tasks as [[task pk, task name, task queue], ...], kept up to date by the backend
+    routes = models.JSONField(default=list, blank=True, editable=False)
+    routes_version = models.PositiveIntegerField(default=0, editable=False)
+    # Routing version of the last change to the event or its tasks made by the backend
+    routing_version = models.PositiveIntegerField(default=0, editable=False)
     updated_on = models.DateTimeField(auto_now=True)
     created_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['app_name', 'event_name'], name='dce_event_app_name_event_name_uniq'),
+        ]
+
+    def __str__(self):
+        return self.app_name + ' - ' + self.event_name
+
+
+class RoutingVersion(models.Model):
+    """
+    Single row counter incremented by the backend whenever events or their tasks change.
+    """
+    version = models.PositiveIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.version)
+
+
+class EventTombstone(models.Model):
+    """
+    Record of an event deleted by the backend, so that incremental syncs of the namespaces with tasks on it see the
+    deletion.
+    """
+    app_name = models.CharField(max_length=255)
+    event_name = models.CharField(max_length=255)
+    routing_version = models.PositiveIntegerField(default=0)
+    deleted_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['app_name', 'event_name'], name='dce_tombstone_app_event_idx'),
+        ]
+
     def __str__(self):
         return self.app_name + ' - ' + self.event_name
+
+
+class NamespaceFingerprint(models.Model):
+    """
+    Hash of the events and tasks of a namespace in the registry, as of the last sync of the namespace, and the routing
+    version that the sync saw all changes up to.
+    """
+    namespace = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=40)
+    routing_version = models.PositiveIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.namespace + ' - ' + self.fingerprint
+
+
+class SyncLock(models.Model):
+    """
+    Lease taken by a sync on databases without advisory locks. The lease is free once expires_on has passed.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    owner = models.CharField(max_length=255)
+    expires_on = models.DateTimeField()
+
+    def __str__(self):
+        return self.name + ' - ' + self.owner
@@ -0,0 +1,136 @@
+import threading
+import time
+
+from kombu.utils import json
+
+from django.db import transaction
+
+from django_celery_events import configs, utils
+
+_local = threading.local()
+
+
+class _Batch:
+    """
+    Events published in one transaction, sent in one message once the outermost transaction commits. Events published
+    in a savepoint are dropped if the savepoint rolls back, and sent with the rest of the transaction if it is released.
+    Identical events with identical kwargs are sent once.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.events = []
+        self.savepoints = {}
+
+    def add(self, connection, event, kwargs):
+        savepoint_ids = tuple(connection.savepoint_ids)
+        savepoint = self.savepoints.get(savepoint_ids)
+        if savepoint is None:
+            savepoint = self.savepoints[savepoint_ids] = _Savepoint()
+            transaction.on_commit(savepoint.release, using=self.alias)
+            self._send_last(connection)
+
+        # Keyed by the JSON that kombu serializes the kwargs to, which also encodes dates, UUIDs and decimals
+        key = (event.app_name, event.event_name, json.dumps(kwargs, sort_keys=True))
+        if key not in savepoint.keys:
+            savepoint.keys.add(key)
+            self.events.append((savepoint, key, [event.app_name, event.event_name, kwargs]))
+
+    def is_pending(self, connection):
+        return any(callback[1] == self.send for callback in connection.run_on_commit)
+
+    def _send_last(self, connection):
+        """
+        Moves the on commit callback of the batch after those of its savepoints. Callbacks registered in a savepoint
+        are discarded when it rolls back, so the savepoints whose callback ran before the batch is sent were released.
+        """
+        callbacks = connection.run_on_commit
+        for index, callback in enumerate(callbacks):
+            if callback[1] == self.send:
+                callbacks.append(callbacks.pop(index))
+                break
+
+    def send(self):
+        batches = getattr(_local, 'batches', {})
+        if batches.get(self.alias) is self:
+            del batches[self.alias]
+
+        events = {}
+        for savepoint, key, event in self.events:
+            if savepoint.released:
+                events.setdefault(key, event)
+        send_events(list(events.values()))
+
+
+class _Savepoint:
+    """
+    Keys of the events published at one savepoint level of a batch, and whether the level was released.
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def send_events(events):
+    """
+    Sends [app_name, event_name, kwargs] events in one broadcast message.
+    """
+    from django_celery_events import tasks
+
+    if len(events) > 0:
+        tasks.broadcast_events.apply_async(args=[events], queue=configs.get_broadcast_queue())
+
+
+def publish(event, kwargs=None, using=None):
+    """
+    Publishes event with kwargs once the transaction in progress on the database `using` commits, or right away
+    outside of transactions. Events published in a transaction are not sent if it rolls back, and are deduplicated and
+    sent together in one broadcast message if it commits.
+    """
+    kwargs = kwargs or {}
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        send_events([[event.app_name, event.event_name, kwargs]])
+        return
+
+    _get_batch(connection).add(connection, event, kwargs)
+
+
+def publish_many(event, kwargs_iterable, chunk_size=None, rate_limit=None):
+    """
+    Publishes event once for every kwargs of kwargs_iterable, which is consumed in chunks of chunk_size, each sent in
+    one broadcast message. Chunks are sent right away, whether in a transaction or not. rate_limit is the maximum
+    number of messages per second. Returns the number of events published.
+    """
+    chunk_size = chunk_size or configs.get_publish_chunk_size()
+    count = 0
+    sent_on = None
+    for kwargs_chunk in utils.chunked(kwargs_iterable, chunk_size):
+        if rate_limit and sent_on is not None:
+            time.sleep(max(0, sent_on + 1 / rate_limit - time.monotonic()))
+
+        sent_on = time.monotonic()
+        send_events([[event.app_name, event.event_name, kwargs or {}] for kwargs in kwargs_chunk])
+        count += len(kwargs_chunk)
+
+    return count
+
+
+def _get_batch(connection):
+    """
+    Returns the batch of the transaction in progress on connection. A batch is sent by an on commit callback, and
+    replaced when the callback was discarded by a rollback.
+    """
+    if not hasattr(_local, 'batches'):
+        _local.batches = {}
+
+    batch = _local.batches.get(connection.alias)
+    if batch is None or not batch.is_pending(connection):
+        batch = _local.batches[connection.alias] = _Batch(connection.alias)
+        transaction.on_commit(batch.send, using=connection.alias)
+
+    return batch
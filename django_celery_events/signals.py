@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent by DjangoDBBackend after each backend operation, with the arguments:
+#   backend: the backend instance.
+#   operation: the name of the operation, e.g. 'fetch_events' or 'commit_changes'.
+#   duration: the wall time of the operation in seconds.
+#   queries: the number of database queries run by the operation, including those of nested operations.
+#   rows: the number of events or tasks the operation read or changed, or None if it does not apply.
+backend_operation = Signal()
@@ -0,0 +1,53 @@
+import logging
+
+from celery import current_app, shared_task
+
+from django_celery_events import configs
+
+logger = logging.getLogger(__name__)
+
+
+def _get_broadcast_task_options():
+    broadcast_task_base = configs.get_broadcast_task_base()
+    return {'base': broadcast_task_base} if broadcast_task_base else {}
+
+
+@shared_task(name='django_celery_events.broadcast_events', **_get_broadcast_task_options())
+def broadcast_events(events):
+    """
+    Sends the tasks of every [app_name, event_name, kwargs] of events with kwargs. With a database backend, the tasks
+    are read from the routing cache, which reloads them only when the routing in the backend changed. With other
+    backends, events out of date with the backend are updated first, as for a single event.
+    """
+    from django_celery_events import registry
+    from django_celery_events.backends import DjangoDBBackend, routing_cache
+
+    registry_events = {(event.app_name, event.event_name): event for event in registry.events}
+    events_to_send = []
+    for app_name, event_name, kwargs in events:
+        event = registry_events.get((app_name, event_name))
+        if event is None:
+            logger.warning('Event %s.%s is not in the registry. It is not broadcast.', app_name, event_name)
+        else:
+            events_to_send.append((event, kwargs))
+
+    backend_class = configs.get_backend_class()
+    if backend_class is not None and issubclass(backend_class, DjangoDBBackend):
+        for event, kwargs in events_to_send:
+            for task_name, task_queue in routing_cache.get_tasks(event.app_name, event.event_name):
+                current_app.send_task(task_name, kwargs=kwargs, queue=task_queue)
+        return
+
+    if backend_class is not None:
+        backend = backend_class(registry)
+        local_event_ids = set(id(event) for event in registry.local_events)
+        local_events = list({
+            id(event): event for event, _ in events_to_send if id(event) in local_event_ids
+        }.values())
+        for event in local_events:
+            if backend.should_update_event(event):
+                backend.update_local_event(event)
+
+    for event, kwargs in events_to_send:
+        for task in event.tasks:
+            current_app.send_task(task.name, kwargs=kwargs, queue=task.queue)
@@ -1,14 +1,31 @@
+import datetime
+import importlib
+import io
+import math
+import os
+import sys
+import tempfile
+import uuid
 from unittest import mock
 
 from celery import Task as CeleryTask
 from celery_events.events import Event, Task
 
-from django.test import TestCase
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.management import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from django_celery_events.apps import DjangoCeleryEventsConfig
-from django_celery_events.backends import DjangoDBBackend
-from django_celery_events import models, configs, registry, app
-from django_celery_events.management.commands import syncevents
+from django_celery_events.backends import (
+    DjangoCacheBackend, DjangoDBBackend, LOOKUP_CHUNK_SIZE, SYNC_LOCK_NAME, RoutingCache, bump_routing_version,
+    get_routing_version, refresh_event_routes, routing_cache, tombstone_events, touch_events
+)
+from django_celery_events import models, configs, registry, app, utils, manifest, signals, publishing, tasks
+from django_celery_events.management.commands import dumpevents, loadevents, publishevents, pruneevents, syncevents
 
 
 class AppConfigTestCase(TestCase):
@@ -56,6 +73,38 @@ class AppConfigTestCase(TestCase):
         except ValueError:
             self.assertEqual(0, len(event.tasks))
 
+    def test_ready_subscribed_events(self):
+        event_1 = registry.create_local_event('app_1', 'event_1')
+        event_2 = registry.remote_event('app_2', 'event_2')
+        event_3 = registry.remote_event('app_2', 'event_3')
+        self.mock_module.EVENT_1 = event_1
+        self.mock_module.EVENT_2 = event_2
+        self.mock_module.SUBSCRIBED_EVENTS = [event_1, ('app_2', 'event_2'), ('app_3', 'event_4')]
+        called_events = []
+
+        def get_event_c_tasks(event):
+            called_events.append(event)
+            return [self.CTask(event.event_name + '_task')]
+
+        self.mock_module.get_event_c_tasks = get_event_c_tasks
+
+        with self.assertLogs('django_celery_events.apps', level='WARNING'):
+            DjangoCeleryEventsConfig.ready(None)
+        self.assertEqual([event_1, event_2], called_events)
+        self.assertEqual([Task('event_1_task', use_routes=False)], event_1.tasks)
+        self.assertEqual([Task('event_2_task', use_routes=False)], event_2.tasks)
+        self.assertEqual([], event_3.tasks)
+
+    def test_ready_event_imported_twice(self):
+        event = registry.create_local_event('app_1', 'event_1')
+        self.mock_module.EVENT = event
+        self.mock_module.SAME_EVENT = event
+        called_events = []
+        self.mock_module.get_event_c_tasks = lambda e: called_events.append(e)
+
+        DjangoCeleryEventsConfig.ready(None)
+        self.assertEqual([event], called_events)
+
 
 class DjangoDBBackendTestCase(TestCase):
 
@@ -116,6 +165,195 @@ class DjangoDBBackendTestCase(TestCase):
         self.assertEqual(task_obj.queue, task.queue)
         self.assertEqual(task_obj, task.backend_obj)
 
+    def test_fetch_events_for_namespaces_shared_task(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app_1', event_name='event_1'),
+            models.Event.objects.create(app_name='app_1', event_name='event_2'),
+            models.Event.objects.create(app_name='app_1', event_name='event_3')
+        ]
+        task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
+        event_objs[0].tasks.add(task_obj)
+        event_objs[1].tasks.add(task_obj)
+
+        backend = DjangoDBBackend(registry)
+        with self.assertNumQueries(1):
+            events = backend.fetch_events_for_namespaces(['app_1'])
+
+        self.assertEqual(['event_1', 'event_2', 'event_3'], [event.event_name for event in events])
+        self.assertEqual([1, 1, 0], [len(event.tasks) for event in events])
+        self.assertIs(events[0].tasks[0].backend_obj, events[1].tasks[0].backend_obj)
+        self.assertEqual(event_objs[0].updated_on, events[0].backend_obj.updated_on)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(event_objs[0].created_on, events[0].backend_obj.created_on)
+
+    def test_fetch_events_many_events(self):
+        models.Event.objects.bulk_create([
+            models.Event(app_name='app_{0}'.format(i % 10), event_name='event_{0}'.format(i))
+            for i in range(10000)
+        ])
+        task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
+        models.Event.objects.get(app_name='app_0', event_name='event_0').tasks.add(task_obj)
+
+        backend = DjangoDBBackend(registry)
+        events = [
+            Event.local_instance('app_{0}'.format(i % 10), 'event_{0}'.format(i), app=app)
+            for i in range(10001)
+        ]
+        with self.assertNumQueries(math.ceil(len(events) / LOOKUP_CHUNK_SIZE)):
+            fetched_events = backend.fetch_events(events)
+
+        self.assertEqual(10000, len(fetched_events))
+        fetched_event = next(e for e in fetched_events if e.event_name == 'event_0')
+        self.assertEqual(['task_1'], [task.name for task in fetched_event.tasks])
+
+    async def test_afetch_events_for_namespaces(self):
+        event_obj = await models.Event.objects.acreate(app_name='app_1', event_name='event')
+        await models.Event.objects.acreate(app_name='app_3', event_name='event')
+        task_obj = await models.Task.objects.acreate(name='task_1', queue='queue_1')
+        await event_obj.tasks.aadd(task_obj)
+
+        backend = DjangoDBBackend(registry)
+        events = await backend.afetch_events_for_namespaces(['app_1', 'app_2'])
+
+        self.assertEqual([('app_1', 'event')], [(event.app_name, event.event_name) for event in events])
+        self.assertEqual(event_obj, events[0].backend_obj)
+        self.assertEqual([('task_1', 'queue_1')], [(task.name, task.queue) for task in events[0].tasks])
+
+    async def test_afetch_events(self):
+        event_obj = await models.Event.objects.acreate(app_name='app_1', event_name='event')
+        await models.Event.objects.acreate(app_name='app_3', event_name='event')
+
+        backend = DjangoDBBackend(registry)
+        events = await backend.afetch_events([
+            Event.local_instance('app_1', 'event', app=app),
+            Event.local_instance('app_2', 'event', app=app)
+        ])
+
+        self.assertEqual([event_obj], [event.backend_obj for event in events])
+
+    @override_settings(EVENTS_DATABASE='default', EVENTS_READ_DATABASE='replica')
+    def test_get_read_database(self):
+        backend = DjangoDBBackend(registry)
+        self.assertEqual('default', backend.database)
+        self.assertEqual('replica', backend.get_read_database())
+
+        with mock.patch('celery_events.backends.Backend.sync_local_events') as mock_sync_local_events:
+            mock_sync_local_events.side_effect = lambda: self.assertEqual('default', backend.get_read_database())
+            backend.sync_local_events()
+            mock_sync_local_events.assert_called_once()
+
+        self.assertEqual('replica', backend.get_read_database())
+
+    def test_backend_refs_use_backend_database(self):
+        event_obj = models.Event.objects.create(app_name='app', event_name='event')
+        event_obj.tasks.add(models.Task.objects.create(name='task'))
+        backend = DjangoDBBackend(registry)
+        backend.database = 'default'
+        events = backend.fetch_events([Event.local_instance('app', 'event', app=app)])
+
+        with mock.patch('django_celery_events.configs.get_database', return_value='unknown'):
+            self.assertEqual(event_obj.created_on, events[0].backend_obj.created_on)
+            self.assertEqual('default', events[0].tasks[0].backend_obj.using)
+
+    def test_dump_events(self):
+        task_obj_1 = models.Task.objects.create(name='task_1', queue='queue_1')
+        task_obj_2 = models.Task.objects.create(name='task_2')
+        event_obj_1 = models.Event.objects.create(app_name='app_1', event_name='event')
+        event_obj_1.tasks.add(task_obj_1, task_obj_2)
+        models.Event.objects.create(app_name='app_2', event_name='event')
+
+        backend = DjangoDBBackend(registry)
+        self.assertEqual(
+            [('app_1', 'event', [['task_1', 'queue_1'], ['task_2', None]]), ('app_2', 'event', [])],
+            [(app_name, event_name, sorted(tasks)) for app_name, event_name, tasks in backend.dump_events()]
+        )
+        self.assertEqual([('app_2', 'event', [])], list(backend.dump_events(['app_2'])))
+
+    def test_load_events(self):
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
+        event_obj.tasks.add(models.Task.objects.create(name='task_1', queue='queue_1'))
+
+        backend = DjangoDBBackend(registry)
+        counts = backend.load_events(iter([
+            ('app_1', 'event', [('task_1', 'queue_1'), ('task_2', None)]),
+            ('app_2', 'event', [('task_1', 'queue_1')]),
+            ('app_3', 'event', []),
+        ]), chunk_size=2)
+
+        self.assertEqual((3, 2), counts)
+        self.assertEqual(3, models.Event.objects.count())
+        self.assertEqual(2, models.Task.objects.count())
+        self.assertEqual(
+            [('task_1', 'queue_1'), ('task_2', None)],
+            list(event_obj.tasks.order_by('name').values_list('name', 'queue'))
+        )
+        self.assertEqual(
+            [('task_1', 'queue_1')],
+            list(models.Event.objects.get(app_name='app_2').tasks.values_list('name', 'queue'))
+        )
+        self.assertEqual(
+            ['task_1', 'task_2'],
+            [name for _, name, _ in models.Event.objects.get(app_name='app_1').routes]
+        )
+
+    def test_prune(self):
+        registry.create_local_event('app_1', 'event')
+        registry.remote_event('app_2', 'event')
+        task_obj = models.Task.objects.create(name='task_1')
+        models.Event.objects.create(app_name='app_1', event_name='event')
+        models.Event.objects.create(app_name='app_2', event_name='event')
+        models.Event.objects.create(app_name='app_3', event_name='event').tasks.add(task_obj)
+        models.Event.objects.create(app_name='app_4', event_name='event_1')
+        models.Event.objects.create(app_name='app_4', event_name='event_2')
+        models.Task.objects.create(name='task_2')
+        models.Task.objects.create(name='task_3')
+        models.NamespaceFingerprint.objects.create(namespace='app_4', fingerprint='fingerprint')
+
+        backend = DjangoDBBackend(registry)
+        namespaces = ['app_2', 'app_3', 'app_4']
+        self.assertEqual((2, 2), backend.prune(namespaces=namespaces, dry_run=True))
+        self.assertEqual(5, models.Event.objects.count())
+
+        self.assertEqual((2, 2), backend.prune(namespaces=namespaces, batch_size=1))
+        self.assertEqual(0, models.SyncLock.objects.count())
+        self.assertEqual(
+            ['app_1', 'app_2', 'app_3'],
+            list(models.Event.objects.order_by('app_name').values_list('app_name', flat=True))
+        )
+        self.assertEqual(['task_1'], list(models.Task.objects.values_list('name', flat=True)))
+        self.assertEqual(0, models.NamespaceFingerprint.objects.count())
+
+    def test_prune_without_namespaces(self):
+        models.Event.objects.create(app_name='app_1', event_name='event')
+        models.Task.objects.create(name='task_1')
+
+        self.assertEqual((1, 0), DjangoDBBackend(registry).prune())
+        self.assertEqual(1, models.Event.objects.count())
+
+    def test_prune_older_than(self):
+        models.Event.objects.create(app_name='app_1', event_name='event')
+        models.Event.objects.create(app_name='app_2', event_name='event')
+        models.Event.objects.create(app_name='app_3', event_name='event')
+        models.Event.objects.update(updated_on=timezone.now() - datetime.timedelta(days=60))
+        models.Event.objects.filter(app_name='app_2').update(updated_on=timezone.now())
+        models.NamespaceFingerprint.objects.create(namespace='app_3', fingerprint='fingerprint')
+
+        self.assertEqual((0, 1), DjangoDBBackend(registry).prune(older_than=datetime.timedelta(days=30)))
+        self.assertEqual(
+            ['app_2', 'app_3'],
+            list(models.Event.objects.order_by('app_name').values_list('app_name', flat=True))
+        )
+
+    def test_prune_tombstones(self):
+        models.NamespaceFingerprint.objects.create(namespace='app_1', fingerprint='fingerprint', routing_version=2)
+        models.NamespaceFingerprint.objects.create(namespace='app_2', fingerprint='fingerprint', routing_version=3)
+        for routing_version in (1, 2, 3):
+            models.EventTombstone.objects.create(app_name='app', event_name='event', routing_version=routing_version)
+
+        DjangoDBBackend(registry).prune()
+        self.assertEqual([3], list(models.EventTombstone.objects.values_list('routing_version', flat=True)))
+
     def test_fetch_events_for_no_events(self):
         backend = DjangoDBBackend(registry)
         events = backend.fetch_events([])
@@ -148,6 +386,99 @@ class DjangoDBBackendTestCase(TestCase):
         backend = DjangoDBBackend(registry)
         self.assertFalse(backend.should_update_event(event))
 
+    def test_should_update_events(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app_1', event_name='event_1'),
+            models.Event.objects.create(app_name='app_1', event_name='event_2'),
+            models.Event.objects.create(app_name='app_2', event_name='event_1')
+        ]
+        events = [
+            registry.create_local_event('app_1', 'event_1'),
+            registry.create_local_event('app_1', 'event_2'),
+            registry.create_local_event('app_2', 'event_1'),
+            registry.create_local_event('app_2', 'event_2')
+        ]
+        for event, event_obj in zip(events, event_objs):
+            event.backend_obj = event_obj
+        models.Event.objects.get(pk=event_objs[1].pk).save()
+        event_objs[2].delete()
+
+        backend = DjangoDBBackend(registry)
+        with self.assertNumQueries(1):
+            self.assertEqual([False, True, False, True], backend.should_update_events(events))
+
+    def test_should_update_events_chunked(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app', event_name='event_{0}'.format(i))
+            for i in range(LOOKUP_CHUNK_SIZE + 1)
+        ]
+        events = []
+        for event_obj in event_objs:
+            event = Event.local_instance(event_obj.app_name, event_obj.event_name, app=app)
+            event.backend_obj = event_obj
+            events.append(event)
+
+        backend = DjangoDBBackend(registry)
+        with self.assertNumQueries(2):
+            self.assertFalse(any(backend.should_update_events(events)))
+
+    def test_update_local_events(self):
+        events = [
+            registry.create_local_event('app', 'event_1'),
+            registry.create_local_event('app', 'event_2')
+        ]
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch.object(backend, 'should_update_events', return_value=[False, True]), \
+                mock.patch.object(backend, 'update_local_event') as mock_update_local_event:
+            backend.update_local_events(events)
+
+        mock_update_local_event.assert_called_once_with(events[1])
+
+    def sync_and_check_events(self, sync_method, event_count):
+        events = []
+        for i in range(event_count):
+            event = registry.create_local_event('app_{0}'.format(event_count), 'event_{0}'.format(i))
+            event.backend_obj = models.Event.objects.create(app_name=event.app_name, event_name=event.event_name)
+            events.append(event)
+
+        def sync(backend):
+            for event in events:
+                self.assertFalse(backend.should_update_event(event))
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch('celery_events.backends.Backend.' + sync_method, autospec=True, side_effect=sync), \
+                CaptureQueriesContext(connection) as queries:
+            getattr(backend, sync_method)()
+
+        return len(queries)
+
+    def test_sync_local_events_constant_queries(self):
+        self.assertEqual(
+            self.sync_and_check_events('sync_local_events', 2),
+            self.sync_and_check_events('sync_local_events', 20)
+        )
+
+    def test_sync_remote_events_constant_queries(self):
+        self.assertEqual(
+            self.sync_and_check_events('sync_remote_events', 2),
+            self.sync_and_check_events('sync_remote_events', 20)
+        )
+
+    def test_should_update_event_after_commit_while_syncing(self):
+        event = registry.create_local_event('app', 'event')
+        event.backend_obj = models.Event.objects.create(app_name='app', event_name='event')
+        backend = DjangoDBBackend(registry)
+
+        with backend._syncing():
+            self.assertFalse(backend.should_update_event(event))
+            models.Event.objects.filter(pk=event.backend_obj.pk).update(
+                updated_on=event.backend_obj.updated_on + datetime.timedelta(seconds=1)
+            )
+            with mock.patch('celery_events.backends.Backend.commit_changes', autospec=True):
+                backend.commit_changes()
+            self.assertTrue(backend.should_update_event(event))
+
     def test_delete_events(self):
         event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
         task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
@@ -186,6 +517,37 @@ class DjangoDBBackendTestCase(TestCase):
             task_objs = event_obj.tasks.all().order_by('name')
             self.assertEqual(0, task_objs.count())
 
+    def test_create_events_duplicate(self):
+        models.Event.objects.create(app_name='app_1', event_name='event')
+
+        backend = DjangoDBBackend(registry)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            backend.create_events([Event.local_instance('app_1', 'event', app=app)])
+
+        self.assertEqual(1, models.Event.objects.count())
+
+    def test_backend_operation_signal(self):
+        receiver = mock.Mock()
+        signals.backend_operation.connect(receiver)
+        self.addCleanup(signals.backend_operation.disconnect, receiver)
+
+        backend = DjangoDBBackend(registry)
+        backend.create_events([Event.local_instance('app_1', 'event', app=app)])
+        backend.fetch_events_for_namespaces(['app_1'])
+
+        self.assertEqual(
+            ['create_events', 'fetch_events_for_namespaces'],
+            [call[1]['operation'] for call in receiver.call_args_list]
+        )
+        create_events_kwargs, fetch_events_kwargs = [call[1] for call in receiver.call_args_list]
+        self.assertEqual(DjangoDBBackend, create_events_kwargs['sender'])
+        self.assertEqual(backend, create_events_kwargs['backend'])
+        self.assertEqual(1, create_events_kwargs['rows'])
+        self.assertGreater(create_events_kwargs['queries'], 0)
+        self.assertGreaterEqual(create_events_kwargs['duration'], 0)
+        self.assertEqual(1, fetch_events_kwargs['rows'])
+        self.assertEqual(1, fetch_events_kwargs['queries'])
+
     def test_create_tasks(self):
         event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
         initial_event_updated_on = event_obj.updated_on
@@ -213,6 +575,90 @@ class DjangoDBBackendTestCase(TestCase):
             self.assertEqual(task_obj.queue, task.queue)
             self.assertEqual(task_obj, task.backend_obj)
 
+    def test_create_and_remove_tasks_refresh_routes(self):
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
+        event = Event.local_instance('app_1', 'event', app=app)
+        event.backend_obj = event_obj
+        tasks = [
+            Task.local_instance('task_1', app=app),
+            Task.local_instance('task_2', queue='queue_2', app=app)
+        ]
+
+        backend = DjangoDBBackend(registry)
+        backend.create_tasks(event, tasks)
+        event_obj.refresh_from_db()
+        self.assertEqual(
+            [[tasks[0].backend_obj.pk, 'task_1', None], [tasks[1].backend_obj.pk, 'task_2', 'queue_2']],
+            event_obj.routes
+        )
+        self.assertEqual(1, event_obj.routes_version)
+
+        backend.remove_tasks(event, tasks[:1])
+        event_obj.refresh_from_db()
+        self.assertEqual([[tasks[1].backend_obj.pk, 'task_2', 'queue_2']], event_obj.routes)
+        self.assertEqual(2, event_obj.routes_version)
+
+    @override_settings(EVENTS_ROUTES_SNAPSHOT=True)
+    def test_fetch_events_with_routes_snapshot(self):
+        events = [Event.local_instance('app_1', 'event_1', app=app), Event.local_instance('app_1', 'event_2', app=app)]
+        task = Task.local_instance('task_1', queue='queue_1', app=app)
+        backend = DjangoDBBackend(registry)
+        backend.create_events(events)
+        backend.create_tasks(events[0], [task])
+
+        with CaptureQueriesContext(connection) as queries:
+            fetched_events = backend.fetch_events_for_namespaces(['app_1'])
+
+        self.assertEqual(1, len(queries))
+        self.assertNotIn('JOIN', queries[0]['sql'])
+        self.assertEqual(['event_1', 'event_2'], [event.event_name for event in fetched_events])
+        self.assertEqual([('task_1', 'queue_1')], [(t.name, t.queue) for t in fetched_events[0].tasks])
+        self.assertEqual(task.backend_obj, fetched_events[0].tasks[0].backend_obj)
+        self.assertEqual(0, len(fetched_events[1].tasks))
+
+    def test_create_tasks_shared_between_events(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app_1', event_name='event'),
+            models.Event.objects.create(app_name='app_2', event_name='event')
+        ]
+        existing_task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
+
+        backend = DjangoDBBackend(registry)
+        for event_obj in event_objs:
+            event = Event.local_instance(event_obj.app_name, event_obj.event_name, app=app)
+            event.backend_obj = event_obj
+            backend.create_tasks(event, [
+                Task.local_instance('task_1', queue='queue_1', app=app),
+                Task.local_instance('task_2', queue='queue_2', app=app)
+            ])
+
+        self.assertEqual(2, models.Task.objects.count())
+        for event_obj in event_objs:
+            task_objs = event_obj.tasks.order_by('name')
+            self.assertEqual(['task_1', 'task_2'], [task_obj.name for task_obj in task_objs])
+            self.assertEqual(existing_task_obj, task_objs[0])
+
+    def test_task_without_queue_unique(self):
+        models.Task.objects.create(name='task_1')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            models.Task.objects.create(name='task_1')
+
+    def test_create_tasks_created_concurrently(self):
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
+        event = Event.local_instance('app_1', 'event', app=app)
+        event.backend_obj = event_obj
+        backend = DjangoDBBackend(registry)
+        concurrent_task_obj = models.Task.objects.create(name='task_1')
+
+        # The task is created by another process after the backend looked it up
+        backend_tasks = backend._fetch_backend_tasks({('task_1', None)})
+        with mock.patch.object(backend, '_fetch_backend_tasks', side_effect=[{}, backend_tasks]):
+            backend.create_tasks(event, [Task.local_instance('task_1', app=app)])
+
+        self.assertEqual(1, models.Task.objects.count())
+        self.assertEqual([concurrent_task_obj], list(event_obj.tasks.all()))
+
     def test_remove_tasks(self):
         event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
         initial_event_updated_on = event_obj.updated_on
@@ -239,6 +685,26 @@ class DjangoDBBackendTestCase(TestCase):
         task_obj, task = task_objs.first(), Task.local_instance('task_2', app=app)
         self.assertEqual(task_obj.name, task.name)
         self.assertEqual(task_obj.queue, task.queue)
+        self.assertFalse(models.Task.objects.filter(pk=current_task_objs[0].pk).exists())
+
+    def test_remove_tasks_shared_task(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app_1', event_name='event'),
+            models.Event.objects.create(app_name='app_2', event_name='event')
+        ]
+        task_obj = models.Task.objects.create(name='task_1')
+        for event_obj in event_objs:
+            event_obj.tasks.add(task_obj)
+
+        backend = DjangoDBBackend(registry)
+        event = Event.local_instance('app_1', 'event', app=app)
+        event.backend_obj = event_objs[0]
+        task = Task.local_instance('task_1', app=app)
+        task.backend_obj = task_obj
+        backend.remove_tasks(event, [task])
+
+        self.assertEqual(0, event_objs[0].tasks.count())
+        self.assertEqual([task_obj], list(event_objs[1].tasks.all()))
 
     def test_update_tasks(self):
         event_obj = models.Event.objects.create(app_name='app', event_name='event')
@@ -270,6 +736,261 @@ class DjangoDBBackendTestCase(TestCase):
             self.assertEqual(task_obj.name, task.name)
             self.assertEqual(task_obj.queue, task.queue)
 
+    def test_update_tasks_shared_task(self):
+        event_objs = [
+            models.Event.objects.create(app_name='app_1', event_name='event'),
+            models.Event.objects.create(app_name='app_2', event_name='event')
+        ]
+        task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
+        for event_obj in event_objs:
+            event_obj.tasks.add(task_obj)
+
+        backend = DjangoDBBackend(registry)
+        event = Event.local_instance('app_1', 'event', app=app)
+        event.backend_obj = event_objs[0]
+        task = Task('task_1', queue='queue_2')
+        task.backend_obj = task_obj
+        backend.update_tasks(event, [task])
+
+        self.assertEqual(2, models.Task.objects.count())
+        self.assertEqual([('task_1', 'queue_2')], list(event_objs[0].tasks.values_list('name', 'queue')))
+        self.assertEqual([('task_1', 'queue_1')], list(event_objs[1].tasks.values_list('name', 'queue')))
+        self.assertEqual(event_objs[0].tasks.get(), task.backend_obj)
+
+    def commit_tasks_changes(self, event_count):
+        events = []
+        for i in range(event_count):
+            event_obj = models.Event.objects.create(
+                app_name='app_{0}'.format(event_count),
+                event_name='event_{0}'.format(i)
+            )
+            task_objs = [
+                models.Task.objects.create(name='task_{0}_{1}_1'.format(event_count, i)),
+                models.Task.objects.create(name='task_{0}_{1}_2'.format(event_count, i))
+            ]
+            event_obj.tasks.set(task_objs)
+            event = Event.local_instance(event_obj.app_name, event_obj.event_name, app=app)
+            event.backend_obj = event_obj
+            task_to_remove = Task.local_instance(task_objs[0].name, app=app)
+            task_to_remove.backend_obj = task_objs[0]
+            task_to_update = Task(task_objs[1].name, queue='queue')
+            task_to_update.backend_obj = task_objs[1]
+            events.append((event, task_to_remove, task_to_update))
+
+        task_name = 'task_{0}'.format(event_count)
+
+        def commit_changes(backend, **kwargs):
+            for event, task_to_remove, task_to_update in events:
+                backend.create_tasks(event, [Task.local_instance(task_name, queue='queue', app=app)])
+                backend.remove_tasks(event, [task_to_remove])
+                backend.update_tasks(event, [task_to_update])
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch('celery_events.backends.Backend.commit_changes', autospec=True, side_effect=commit_changes), \
+                CaptureQueriesContext(connection) as queries:
+            backend.commit_changes()
+
+        for event, task_to_remove, task_to_update in events:
+            task_objs = models.Event.objects.get(pk=event.backend_obj.pk).tasks.order_by('name')
+            self.assertEqual(
+                [(task_name, 'queue'), (task_to_update.name, 'queue')],
+                [(task_obj.name, task_obj.queue) for task_obj in task_objs]
+            )
+            self.assertFalse(models.Task.objects.filter(name=task_to_remove.name).exists())
+
+        return len(queries)
+
+    def test_commit_changes_constant_queries(self):
+        self.assertEqual(self.commit_tasks_changes(2), self.commit_tasks_changes(20))
+
+    def test_get_changed_namespaces(self):
+        registry.create_local_event('app_1', 'event')
+        remote_event = registry.remote_event('another_app', 'event')
+        remote_event.add_task(Task.local_instance('app_2.task', use_routes=False))
+        event_obj = models.Event.objects.create(app_name='another_app', event_name='event')
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch.object(backend, 'get_local_namespaces', return_value=['app_1', 'app_2', 'app_3']):
+            fingerprints = backend.get_namespace_fingerprints()
+            self.assertEqual(['app_1', 'app_2'], sorted(fingerprints))
+            self.assertEqual(['app_1', 'app_2'], backend.get_changed_namespaces(fingerprints))
+
+            backend.store_namespace_fingerprints(fingerprints, ['app_1', 'app_2', 'app_3'])
+            self.assertEqual([], backend.get_changed_namespaces(fingerprints))
+
+            models.Event.objects.get(pk=event_obj.pk).save()
+            self.assertEqual(['app_2'], backend.get_changed_namespaces(fingerprints))
+
+    def test_get_namespace_changes(self):
+        registry.create_local_event('app_1', 'event')
+        for event_name in ('event_1', 'event_2', 'event_3'):
+            remote_event = registry.remote_event('another_app', event_name)
+            remote_event.add_task(Task.local_instance('app_2.task', use_routes=False))
+            models.Event.objects.create(app_name='another_app', event_name=event_name)
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch.object(backend, 'get_local_namespaces', return_value=['app_1', 'app_2']):
+            fingerprints = backend.get_namespace_fingerprints()
+            self.assertEqual({'app_1': None, 'app_2': None}, backend.get_namespace_changes(fingerprints))
+
+            backend.store_namespace_fingerprints(
+                fingerprints, ['app_1', 'app_2'], routing_version=backend.get_routing_version()
+            )
+            self.assertEqual({}, backend.get_namespace_changes(fingerprints))
+
+            # Changes made by another process after the sync, with updated_on left behind the sync
+            event_1 = Event.local_instance('another_app', 'event_1', app=app)
+            event_1.backend_obj = models.Event.objects.get(event_name='event_1')
+            event_2 = Event.local_instance('another_app', 'event_2', app=app)
+            event_2.backend_obj = models.Event.objects.get(event_name='event_2')
+
+            def commit_changes(other_backend, **kwargs):
+                other_backend.create_tasks(event_1, [Task.local_instance('another_app.task', use_routes=False)])
+                other_backend.delete_events([event_2])
+
+            other_backend = DjangoDBBackend(registry)
+            with mock.patch('celery_events.backends.Backend.commit_changes', autospec=True, side_effect=commit_changes):
+                other_backend.commit_changes()
+            models.Event.objects.update(updated_on=timezone.now() - datetime.timedelta(days=1))
+
+            self.assertEqual(1, models.EventTombstone.objects.filter(event_name='event_2').count())
+            self.assertEqual(
+                {'app_2': {('another_app', 'event_1'), ('another_app', 'event_2')}},
+                backend.get_namespace_changes(fingerprints)
+            )
+            self.assertEqual(['app_2'], backend.get_changed_namespaces(fingerprints))
+
+            backend.store_namespace_fingerprints(
+                fingerprints, ['app_2'], routing_version=backend.get_routing_version()
+            )
+            self.assertEqual({}, backend.get_namespace_changes(fingerprints))
+
+    def test_get_namespace_changes_local_events(self):
+        registry.create_local_event('app_1', 'event_1')
+        registry.create_local_event('app_2', 'event_2')
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event_1')
+        models.Event.objects.create(app_name='app_2', event_name='event_2')
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch.object(backend, 'get_local_namespaces', return_value=['app_1', 'app_2']):
+            fingerprints = backend.get_namespace_fingerprints()
+            backend.store_namespace_fingerprints(
+                fingerprints, ['app_1', 'app_2'], routing_version=backend.get_routing_version()
+            )
+            models.Event.objects.update(updated_on=timezone.now() - datetime.timedelta(days=1))
+            self.assertEqual({}, backend.get_namespace_changes(fingerprints))
+
+            # Local events edited and deleted outside of the backend, e.g. in the admin
+            touch_events([event_obj.pk])
+            models.Event.objects.update(updated_on=timezone.now() - datetime.timedelta(days=1))
+            self.assertEqual({'app_1': None}, backend.get_namespace_changes(fingerprints))
+
+            models.Event.objects.filter(app_name='app_2').delete()
+            tombstone_events([('app_2', 'event_2')])
+            models.EventTombstone.objects.update(deleted_on=timezone.now() - datetime.timedelta(days=1))
+            self.assertEqual({'app_1': None, 'app_2': None}, backend.get_namespace_changes(fingerprints))
+
+    def test_scope_remote_event_keys(self):
+        remote_event_1 = registry.remote_event('another_app', 'event_1')
+        registry.remote_event('another_app', 'event_2')
+
+        backend = DjangoDBBackend(registry)
+        backend.scope(['app_1'], remote_event_keys=[('another_app', 'event_1')])
+        self.assertEqual([remote_event_1], backend.registry.remote_events)
+        self.assertEqual([remote_event_1], backend.registry.events)
+
+        backend.scope(['app_1'])
+        self.assertEqual(2, len(backend.registry.remote_events))
+
+    def test_get_registry_namespaces(self):
+        registry.create_local_event('app_1', 'event')
+        remote_event = registry.remote_event('another_app', 'event')
+        remote_event.add_task(Task.local_instance('app_2.task', use_routes=False))
+        models.NamespaceFingerprint.objects.create(namespace='app_3', fingerprint='fingerprint')
+        models.Event.objects.create(app_name='app_4', event_name='event')
+        models.Event.objects.create(app_name='another_app', event_name='event').tasks.add(
+            models.Task.objects.create(name='app_5.task')
+        )
+        models.Task.objects.create(name='app_6.task')
+
+        backend = DjangoDBBackend(registry)
+        all_models = {'app_1': {}, 'app_2': {}, 'app_3': {}, 'app_4': {}, 'app_5': {}, 'app_6': {}, 'app_7': {}}
+        with mock.patch('django_celery_events.backends.apps.all_models', all_models):
+            self.assertEqual(
+                ['app_1', 'app_2', 'app_3', 'app_4', 'app_5'],
+                backend.get_registry_namespaces()
+            )
+
+    def test_scope(self):
+        registry.create_local_event('app_1', 'event')
+        registry.create_local_event('app_2', 'event')
+        remote_event = registry.remote_event('another_app', 'event')
+
+        backend = DjangoDBBackend(registry)
+        backend.scope(['app_1'])
+        backend.scope(['app_2'])
+
+        self.assertEqual(['app_2'], backend.get_local_namespaces())
+        self.assertEqual([('app_2', 'event')], [(e.app_name, e.event_name) for e in backend.registry.local_events])
+        self.assertEqual([remote_event], backend.registry.remote_events)
+
+    @mock.patch('django_celery_events.backends.connections')
+    def test_sync_lock(self, mock_connections):
+        # Advisory locks are reentrant within a session, so the lease is tested on every database
+        mock_connections.__getitem__.return_value.vendor = 'sqlite'
+        backend = DjangoDBBackend(registry)
+        with backend.sync_lock():
+            with self.assertRaises(TimeoutError), DjangoDBBackend(registry).sync_lock(timeout=0):
+                pass
+
+        with DjangoDBBackend(registry).sync_lock(timeout=0):
+            pass
+
+    @mock.patch('django_celery_events.backends.connections')
+    def test_sync_lock_expired_lease(self, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'sqlite'
+        models.SyncLock.objects.create(
+            name=SYNC_LOCK_NAME,
+            owner='another_owner',
+            expires_on=timezone.now() - datetime.timedelta(seconds=1)
+        )
+
+        with DjangoDBBackend(registry).sync_lock(timeout=0):
+            self.assertNotEqual('another_owner', models.SyncLock.objects.get().owner)
+
+        self.assertEqual(0, models.SyncLock.objects.count())
+
+    @mock.patch('django_celery_events.backends.connections')
+    def test_renew_sync_lock(self, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'sqlite'
+        backend = DjangoDBBackend(registry)
+        with backend.sync_lock():
+            models.SyncLock.objects.update(expires_on=timezone.now())
+            backend.renew_sync_lock()
+            self.assertGreater(models.SyncLock.objects.get().expires_on, timezone.now())
+
+            models.SyncLock.objects.update(owner='another_owner')
+            with self.assertRaises(TimeoutError):
+                backend.renew_sync_lock()
+
+        backend.renew_sync_lock()
+
+    def test_get_namespace_remote_event_keys(self):
+        remote_event_1 = registry.remote_event('another_app', 'event_1')
+        remote_event_1.add_task(Task.local_instance('app_1.task', use_routes=False))
+        registry.remote_event('another_app', 'event_2')
+        registry.remote_event('another_app', 'event_3')
+        models.Event.objects.create(app_name='another_app', event_name='event_2').tasks.add(
+            models.Task.objects.create(name='app_2.task')
+        )
+
+        backend = DjangoDBBackend(registry)
+        with mock.patch.object(backend, 'get_local_namespaces', return_value=['app_1', 'app_2']):
+            self.assertEqual(
+                {'app_1': {('another_app', 'event_1')}, 'app_2': {('another_app', 'event_2')}},
+                dict(backend.get_namespace_remote_event_keys())
+            )
+
     def test_update_local_event(self):
         event = registry.create_local_event('django_celery_events', 'event')
         c_task = self.create_c_task('django_celery_events.task_1')
@@ -343,6 +1064,308 @@ class DjangoDBBackendTestCase(TestCase):
         self.assertEqual(local_task_to_update.queue, task_obj.queue)
 
 
+@override_settings(EVENTS_CACHE='events', CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'events': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'events'}
+})
+class DjangoCacheBackendTestCase(TestCase):
+
+    def setUp(self):
+        caches['events'].clear()
+        self.event_obj = models.Event.objects.create(app_name='app_1', event_name='event_1')
+        self.task_obj = models.Task.objects.create(name='task_1', queue='queue_1')
+        self.event_obj.tasks.add(self.task_obj)
+        models.Event.objects.create(app_name='app_1', event_name='event_2')
+        models.Event.objects.create(app_name='app_2', event_name='event_1')
+
+    def tearDown(self):
+        registry.events = []
+
+    def test_fetch_events_for_namespaces(self):
+        backend = DjangoCacheBackend(registry)
+        with self.assertNumQueries(1):
+            backend.fetch_events_for_namespaces(['app_1', 'app_3'])
+
+        with self.assertNumQueries(0):
+            events = backend.fetch_events_for_namespaces(['app_1', 'app_3'])
+
+        self.assertEqual(['event_1', 'event_2'], [event.event_name for event in events])
+        self.assertEqual(self.event_obj, events[0].backend_obj)
+        self.assertEqual(self.event_obj.updated_on, events[0].backend_obj.updated_on)
+        self.assertEqual([('task_1', 'queue_1')], [(task.name, task.queue) for task in events[0].tasks])
+        self.assertEqual(self.task_obj, events[0].tasks[0].backend_obj)
+
+    def test_fetch_events(self):
+        backend = DjangoCacheBackend(registry)
+        backend.fetch_events_for_namespaces(['app_1', 'app_2'])
+
+        with self.assertNumQueries(0):
+            events = backend.fetch_events([
+                Event.local_instance('app_1', 'event_1', app=app),
+                Event.local_instance('app_2', 'event_2', app=app)
+            ])
+
+        self.assertEqual([('app_1', 'event_1')], [(event.app_name, event.event_name) for event in events])
+
+    async def test_afetch_events_for_namespaces(self):
+        backend = DjangoCacheBackend(registry)
+        await backend.afetch_events_for_namespaces(['app_1'])
+
+        # Query counting connects to the database synchronously, which is not allowed here
+        with mock.patch.object(backend, '_aevent_rows', side_effect=AssertionError('Database queried.')):
+            events = await backend.afetch_events([Event.local_instance('app_1', 'event_1', app=app)])
+        self.assertEqual(self.event_obj, events[0].backend_obj)
+
+    def test_fetch_events_while_syncing(self):
+        backend = DjangoCacheBackend(registry)
+        backend.fetch_events_for_namespaces(['app_1'])
+        models.Event.objects.create(app_name='app_1', event_name='event_3')
+        self.event_obj.tasks.clear()
+
+        with backend._syncing():
+            events = backend.fetch_events_for_namespaces(['app_1'])
+            self.assertEqual(['event_1', 'event_2', 'event_3'], [event.event_name for event in events])
+            self.assertEqual([], events[0].tasks)
+
+            events = backend.fetch_events([Event.local_instance('app_1', 'event_3', app=app)])
+            self.assertEqual(['event_3'], [event.event_name for event in events])
+
+        events = backend.fetch_events_for_namespaces(['app_1'])
+        self.assertEqual(['event_1', 'event_2'], [event.event_name for event in events])
+
+    def test_sync_local_events_with_stale_cache(self):
+        registry.create_local_event('app_1', 'event_1')
+        registry.create_local_event('app_1', 'event_2')
+        registry.create_local_event('app_1', 'event_3')
+        backend = DjangoCacheBackend(registry)
+        backend.fetch_events_for_namespaces(['app_1'])
+        models.Event.objects.create(app_name='app_1', event_name='event_3')
+
+        with mock.patch.object(backend, 'get_local_namespaces', return_value=['app_1']), \
+                self.captureOnCommitCallbacks(execute=True):
+            backend.sync_local_events()
+
+        event_objs = models.Event.objects.filter(app_name='app_1').order_by('event_name')
+        self.assertEqual(['event_1', 'event_2', 'event_3'], list(event_objs.values_list('event_name', flat=True)))
+
+    def test_prune_deletes_cached_rows(self):
+        backend = DjangoCacheBackend(registry)
+        backend.fetch_events_for_namespaces(['app_1', 'app_2'])
+
+        self.assertEqual((0, 1), backend.prune(namespaces=['app_1', 'app_2']))
+        self.assertEqual([], backend.fetch_events_for_namespaces(['app_2']))
+        self.assertIsNotNone(caches['events'].get(backend._get_cache_key('app_1')))
+
+    @override_settings(EVENTS_DATABASE='default', EVENTS_READ_DATABASE='replica')
+    def test_commit_repopulates_cache_from_database(self):
+        backend = DjangoCacheBackend(registry)
+        event = Event.local_instance('app_1', 'event_1', app=app)
+        event.backend_obj = self.event_obj
+
+        with mock.patch.object(backend, '_load_namespace_rows') as mock_load_namespace_rows, \
+                self.captureOnCommitCallbacks(execute=True):
+            backend.create_tasks(event, [Task.local_instance('task_2', queue='queue_2', app=app)])
+
+        mock_load_namespace_rows.assert_called_once_with({'app_1'}, using='default')
+
+    def test_commit_repopulates_cache(self):
+        backend = DjangoCacheBackend(registry)
+        event = backend.fetch_events_for_namespaces(['app_1'])[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            backend.create_tasks(event, [Task.local_instance('task_2', queue='queue_2', app=app)])
+
+        with self.assertNumQueries(0):
+            events = backend.fetch_events_for_namespaces(['app_1'])
+        self.assertEqual(
+            [('task_1', 'queue_1'), ('task_2', 'queue_2')],
+            sorted((task.name, task.queue) for task in events[0].tasks)
+        )
+
+
+    @override_settings(EVENTS_BACKEND='django_celery_events.backends.DjangoCacheBackend')
+    def test_touch_and_tombstone_events_rebuild_cached_rows(self):
+        backend = DjangoCacheBackend(registry)
+        backend.fetch_events_for_namespaces(['app_1', 'app_2'])
+
+        self.event_obj.tasks.add(models.Task.objects.create(name='task_2', queue='queue_2'))
+        with self.captureOnCommitCallbacks(execute=True):
+            touch_events([self.event_obj.pk])
+
+        with self.assertNumQueries(0):
+            events = backend.fetch_events_for_namespaces(['app_1'])
+        self.assertEqual(['task_1', 'task_2'], sorted(task.name for task in events[0].tasks))
+
+        models.Event.objects.filter(app_name='app_2').delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_events([('app_2', 'event_1')])
+
+        with self.assertNumQueries(0):
+            self.assertEqual([], backend.fetch_events_for_namespaces(['app_2']))
+
+class RoutingCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.event_obj = models.Event.objects.create(app_name='app', event_name='event')
+        self.event_obj.tasks.add(models.Task.objects.create(name='task_1', queue='queue_1'))
+        models.Event.objects.create(app_name='app', event_name='event_no_tasks')
+
+    def test_get_tasks(self):
+        cache = RoutingCache()
+        self.assertEqual((('task_1', 'queue_1'),), cache.get_tasks('app', 'event'))
+        self.assertEqual((), cache.get_tasks('app', 'event_no_tasks'))
+        self.assertEqual((), cache.get_tasks('app', 'unknown_event'))
+
+    @override_settings(EVENTS_ROUTES_SNAPSHOT=True)
+    def test_get_tasks_with_routes_snapshot(self):
+        refresh_event_routes([self.event_obj.pk])
+        cache = RoutingCache()
+        self.assertEqual((('task_1', 'queue_1'),), cache.get_tasks('app', 'event'))
+        self.assertEqual((), cache.get_tasks('app', 'event_no_tasks'))
+
+    def test_get_tasks_routing_unchanged(self):
+        cache = RoutingCache()
+        cache.get_tasks('app', 'event')
+
+        with self.assertNumQueries(1):
+            self.assertEqual((('task_1', 'queue_1'),), cache.get_tasks('app', 'event'))
+
+    def test_get_tasks_routing_changed(self):
+        cache = RoutingCache()
+        cache.get_tasks('app', 'event')
+
+        backend = DjangoDBBackend(registry)
+        event = Event.local_instance('app', 'event', app=app)
+        event.backend_obj = self.event_obj
+        backend.create_tasks(event, [Task.local_instance('task_2', queue='queue_2', app=app)])
+
+        self.assertEqual(
+            [('task_1', 'queue_1'), ('task_2', 'queue_2')],
+            sorted(cache.get_tasks('app', 'event'))
+        )
+
+    def test_get_tasks_after_touch_events(self):
+        cache = RoutingCache()
+        cache.get_tasks('app', 'event')
+        version = get_routing_version() or 0
+
+        self.event_obj.tasks.add(models.Task.objects.create(name='task_2', queue='queue_2'))
+        touch_events([self.event_obj.pk])
+
+        self.event_obj.refresh_from_db()
+        self.assertEqual(version + 1, self.event_obj.routing_version)
+        self.assertEqual(['task_1', 'task_2'], [name for _, name, _ in self.event_obj.routes])
+        self.assertEqual(
+            [('task_1', 'queue_1'), ('task_2', 'queue_2')],
+            sorted(cache.get_tasks('app', 'event'))
+        )
+
+    def test_tombstone_events(self):
+        version = get_routing_version() or 0
+        tombstone_events([('app', 'event')])
+
+        self.assertEqual(
+            [('app', 'event', version + 1)],
+            list(models.EventTombstone.objects.values_list('app_name', 'event_name', 'routing_version'))
+        )
+
+    def test_get_tasks_with_ttl(self):
+        cache = RoutingCache(ttl=60)
+        cache.get_tasks('app', 'event')
+
+        with self.assertNumQueries(0):
+            self.assertEqual((('task_1', 'queue_1'),), cache.get_tasks('app', 'event'))
+
+
+class ManifestTestCase(TestCase):
+
+    def setUp(self):
+        hash_patcher = mock.patch('django_celery_events.manifest.get_registry_hash', return_value='hash')
+        hash_patcher.start()
+        self.addCleanup(hash_patcher.stop)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, 'manifest.json')
+
+    def tearDown(self):
+        registry.events = []
+
+    def test_write_and_load_manifest(self):
+        local_event = registry.create_local_event('app_1', 'event_1')
+        local_event.add_task(Task.local_instance('app_1.task_1', queue='queue_1', use_routes=False))
+        remote_event = registry.remote_event('app_2', 'event_2')
+        remote_event.add_task(Task.local_instance('app_1.task_2', use_routes=False))
+        manifest.write_manifest(registry, self.path)
+        registry.events = []
+
+        manifest.load_manifest(registry, manifest.read_manifest(self.path))
+
+        self.assertEqual([('app_1', 'event_1')], [(e.app_name, e.event_name) for e in registry.local_events])
+        self.assertEqual([('app_2', 'event_2')], [(e.app_name, e.event_name) for e in registry.remote_events])
+        self.assertEqual([('app_1.task_1', 'queue_1')], [(t.name, t.queue) for t in registry.local_events[0].tasks])
+        self.assertEqual([('app_1.task_2', None)], [(t.name, t.queue) for t in registry.remote_events[0].tasks])
+
+    def test_read_manifest_missing(self):
+        self.assertIsNone(manifest.read_manifest(self.path))
+
+    def test_read_manifest_invalid(self):
+        for content in ['', '{"hash": "hash"', '[]', '{"hash": "hash"}', '\udcff']:
+            with open(self.path, 'w', errors='surrogateescape') as f:
+                f.write(content)
+
+            self.assertIsNone(manifest.read_manifest(self.path), content)
+
+        self.assertIsNone(manifest.read_manifest(os.path.dirname(self.path)))
+
+    def test_read_manifest_stale(self):
+        manifest.write_manifest(registry, self.path)
+
+        with mock.patch('django_celery_events.manifest.get_registry_hash', return_value='new_hash'):
+            self.assertIsNone(manifest.read_manifest(self.path))
+
+    @mock.patch('django_celery_events.apps.configs.get_events_manifest')
+    @mock.patch('django_celery_events.apps.importlib.import_module')
+    def test_ready_with_manifest(self, mock_import_module, mock_get_events_manifest):
+        registry.create_local_event('app_1', 'event_1')
+        manifest.write_manifest(registry, self.path)
+        mock_get_events_manifest.return_value = self.path
+
+        DjangoCeleryEventsConfig.ready(None)
+
+        from django_celery_events import registry as new_registry
+        self.assertEqual(['event_1'], [event.event_name for event in new_registry.local_events])
+        mock_import_module.assert_not_called()
+
+    @mock.patch('django_celery_events.apps.configs.get_events_manifest')
+    def test_import_events_module_after_ready_with_manifest(self, mock_get_events_manifest):
+        local_event = registry.create_local_event('app_1', 'event_1')
+        local_event.add_task(Task.local_instance('app_1.task_1', use_routes=False))
+        registry.remote_event('app_2', 'event_2')
+        manifest.write_manifest(registry, self.path)
+        mock_get_events_manifest.return_value = self.path
+        with mock.patch('django_celery_events.apps.importlib.import_module'):
+            DjangoCeleryEventsConfig.ready(None)
+
+        module_dir = os.path.dirname(self.path)
+        with open(os.path.join(module_dir, 'manifest_app_events.py'), 'w') as f:
+            f.write(
+                'from django_celery_events import app\n'
+                "LOCAL_EVENT = app.registry.create_local_event('app_1', 'event_1')\n"
+                "REMOTE_EVENT = app.registry.remote_event('app_2', 'event_2')\n"
+            )
+        sys.path.insert(0, module_dir)
+        self.addCleanup(sys.path.remove, module_dir)
+        self.addCleanup(sys.modules.pop, 'manifest_app_events', None)
+        module = importlib.import_module('manifest_app_events')
+
+        from django_celery_events import registry as new_registry
+        self.assertEqual(2, len(new_registry.events))
+        self.assertIs(new_registry.local_events[0], module.LOCAL_EVENT)
+        self.assertIs(new_registry.remote_events[0], module.REMOTE_EVENT)
+        self.assertEqual(['app_1.task_1'], [task.name for task in module.LOCAL_EVENT.tasks])
+
+
 class ConfigsTestCase(TestCase):
 
     def setUp(self):
@@ -416,6 +1439,116 @@ class ConfigsTestCase(TestCase):
         self.mock_settings.EVENTS_BACKEND = None
         self.assertIsNone(configs.get_backend_class())
 
+    def test_get_bulk_batch_size_with_settings(self):
+        self.mock_settings.EVENTS_BULK_BATCH_SIZE = 100
+        self.assertEqual(100, configs.get_bulk_batch_size())
+
+    def test_get_bulk_batch_size_no_settings(self):
+        self.mock_settings.EVENTS_BULK_BATCH_SIZE = None
+        self.assertIsNone(configs.get_bulk_batch_size())
+
+    def test_get_routing_cache_ttl_with_settings(self):
+        self.mock_settings.EVENTS_ROUTING_CACHE_TTL = 30
+        self.assertEqual(30, configs.get_routing_cache_ttl())
+
+    def test_get_routing_cache_ttl_no_settings(self):
+        self.mock_settings.EVENTS_ROUTING_CACHE_TTL = None
+        self.assertIsNone(configs.get_routing_cache_ttl())
+
+    def test_get_events_manifest_with_settings(self):
+        self.mock_settings.EVENTS_MANIFEST = 'events_manifest.json'
+        self.assertEqual('events_manifest.json', configs.get_events_manifest())
+
+    def test_get_events_manifest_no_settings(self):
+        self.mock_settings.EVENTS_MANIFEST = None
+        self.assertIsNone(configs.get_events_manifest())
+
+    def test_get_cache_with_settings(self):
+        self.mock_settings.EVENTS_CACHE = 'events'
+        self.assertEqual('events', configs.get_cache())
+
+    def test_get_cache_no_settings(self):
+        self.mock_settings.EVENTS_CACHE = None
+        self.assertEqual('default', configs.get_cache())
+
+    def test_get_cache_timeout_with_settings(self):
+        self.mock_settings.EVENTS_CACHE_TIMEOUT = 60
+        self.assertEqual(60, configs.get_cache_timeout())
+
+    def test_get_cache_timeout_no_settings(self):
+        del self.mock_settings.EVENTS_CACHE_TIMEOUT
+        self.assertEqual(DEFAULT_TIMEOUT, configs.get_cache_timeout())
+
+    def test_get_publish_chunk_size_with_settings(self):
+        self.mock_settings.EVENTS_PUBLISH_CHUNK_SIZE = 100
+        self.assertEqual(100, configs.get_publish_chunk_size())
+
+    def test_get_routes_snapshot_with_settings(self):
+        self.mock_settings.EVENTS_ROUTES_SNAPSHOT = True
+        self.assertTrue(configs.get_routes_snapshot())
+
+    def test_get_routes_snapshot_no_settings(self):
+        del self.mock_settings.EVENTS_ROUTES_SNAPSHOT
+        self.assertFalse(configs.get_routes_snapshot())
+
+    def test_get_publish_chunk_size_no_settings(self):
+        del self.mock_settings.EVENTS_PUBLISH_CHUNK_SIZE
+        self.assertEqual(500, configs.get_publish_chunk_size())
+
+    def test_get_database_with_settings(self):
+        self.mock_settings.EVENTS_DATABASE = 'events'
+        self.assertEqual('events', configs.get_database())
+
+    def test_get_database_no_settings(self):
+        del self.mock_settings.EVENTS_DATABASE
+        self.assertEqual('default', configs.get_database())
+
+    def test_get_read_database_with_settings(self):
+        self.mock_settings.EVENTS_DATABASE = 'events'
+        self.mock_settings.EVENTS_READ_DATABASE = 'events_replica'
+        self.assertEqual('events_replica', configs.get_read_database())
+
+    def test_get_read_database_no_settings(self):
+        self.mock_settings.EVENTS_DATABASE = 'events'
+        del self.mock_settings.EVENTS_READ_DATABASE
+        self.assertEqual('events', configs.get_read_database())
+
+
+class UtilsTestCase(TestCase):
+
+    def test_bulk_create_with_ids(self):
+        event_objs = utils.bulk_create_with_ids([
+            models.Event(app_name='app', event_name='event_1'),
+            models.Event(app_name='app', event_name='event_2')
+        ], unique_fields=('app_name', 'event_name'))
+
+        self.assertEqual(list(models.Event.objects.order_by('event_name')), event_objs)
+
+    @mock.patch('django_celery_events.utils.can_return_ids_from_bulk_insert', return_value=False)
+    def test_bulk_create_with_ids_by_unique_fields(self, mock_can_return_ids_from_bulk_insert):
+        task_objs = [
+            models.Task(name='task_1'),
+            models.Task(name='task_1', queue='queue_1'),
+            models.Task(name='task_2', queue='queue_2')
+        ]
+        utils.bulk_create_with_ids(task_objs, batch_size=2, unique_fields=('name', 'queue'))
+
+        for task_obj in task_objs:
+            self.assertEqual(task_obj, models.Task.objects.get(name=task_obj.name, queue=task_obj.queue))
+
+    @mock.patch('django_celery_events.utils.can_return_ids_from_bulk_insert', return_value=False)
+    def test_bulk_create_with_ids_no_unique_fields(self, mock_can_return_ids_from_bulk_insert):
+        event_objs = utils.bulk_create_with_ids([
+            models.Event(app_name='app', event_name='event_1'),
+            models.Event(app_name='app', event_name='event_2')
+        ])
+
+        self.assertEqual(list(models.Event.objects.order_by('event_name')), event_objs)
+
+    def test_bulk_create_with_ids_no_objs(self):
+        with self.assertNumQueries(0):
+            self.assertEqual([], utils.bulk_create_with_ids([]))
+
 
 class SynceventsTestCase(TestCase):
 
@@ -434,3 +1567,409 @@ class SynceventsTestCase(TestCase):
     def test_no_backend_class(self, mock_get_backend_class):
         mock_get_backend_class.return_value = None
         syncevents.Command().handle()
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_no_changes(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        syncevents.Command().handle()
+
+        with mock.patch.object(DjangoDBBackend, 'sync_local_events') as mock_sync_local_events, \
+                mock.patch.object(DjangoDBBackend, 'sync_remote_events') as mock_sync_remote_events:
+            syncevents.Command().handle()
+            mock_sync_local_events.assert_not_called()
+            mock_sync_remote_events.assert_not_called()
+
+            syncevents.Command().handle(force=True)
+            mock_sync_local_events.assert_called_once()
+            mock_sync_remote_events.assert_called_once()
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_changes(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event_1')
+        self.addCleanup(setattr, registry, 'events', [])
+        syncevents.Command().handle()
+        registry.create_local_event('django_celery_events', 'event_2')
+
+        syncevents.Command().handle()
+        self.assertEqual(
+            ['event_1', 'event_2'],
+            list(models.Event.objects.order_by('event_name').values_list('event_name', flat=True))
+        )
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_incremental(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        remote_event = registry.remote_event('another_app', 'event_1')
+        remote_event.add_task(Task.local_instance('django_celery_events.task', use_routes=False))
+        registry.remote_event('another_app', 'event_2')
+        self.addCleanup(setattr, registry, 'events', [])
+        models.Event.objects.create(app_name='another_app', event_name='event_1')
+        models.Event.objects.create(app_name='another_app', event_name='event_2')
+        syncevents.Command(stdout=io.StringIO()).handle()
+        self.assertEqual(get_routing_version() or 0, models.NamespaceFingerprint.objects.get().routing_version)
+
+        # Another service changes the remote event, with updated_on left behind the sync
+        version = bump_routing_version()
+        models.Event.objects.filter(event_name='event_1').update(routing_version=version)
+        models.Event.objects.update(updated_on=timezone.now() - datetime.timedelta(days=1))
+
+        with mock.patch.object(DjangoDBBackend, 'sync_local_events') as mock_sync_local_events, \
+                mock.patch.object(DjangoDBBackend, 'sync_remote_events', autospec=True) as mock_sync_remote_events:
+            mock_sync_remote_events.side_effect = lambda backend: self.assertEqual(
+                [remote_event], backend.registry.remote_events
+            )
+            syncevents.Command(stdout=io.StringIO()).handle()
+            mock_sync_local_events.assert_not_called()
+            mock_sync_remote_events.assert_called_once()
+
+        self.assertEqual(version, models.NamespaceFingerprint.objects.get().routing_version)
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_dry_run(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        stdout = io.StringIO()
+
+        syncevents.Command(stdout=stdout).handle(dry_run=True)
+        self.assertIn('+ django_celery_events.event', stdout.getvalue())
+        self.assertEqual(0, models.Event.objects.count())
+        self.assertEqual(0, models.NamespaceFingerprint.objects.count())
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_app_labels(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        models.Event.objects.create(app_name='auth', event_name='event')
+
+        syncevents.Command().handle(app_labels=['django_celery_events'])
+
+        self.assertEqual(
+            [('auth', 'event'), ('django_celery_events', 'event')],
+            list(models.Event.objects.order_by('app_name').values_list('app_name', 'event_name'))
+        )
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_unknown_app_label(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+
+        with self.assertRaises(CommandError):
+            syncevents.Command().handle(app_labels=['unknown_app'])
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_lock(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+
+        with mock.patch.object(DjangoDBBackend, 'sync_lock', wraps=DjangoDBBackend(registry).sync_lock) as mock_lock:
+            syncevents.Command().handle(lock=True, lock_timeout=0)
+            mock_lock.assert_called_once_with(timeout=0)
+
+        self.assertEqual(1, models.Event.objects.count())
+        self.assertEqual(['django_celery_events'], list(models.NamespaceFingerprint.objects.values_list(
+            'namespace', flat=True
+        )))
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_lock_scopes_remote_events(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        remote_event = registry.remote_event('another_app', 'event_1')
+        remote_event.add_task(Task.local_instance('django_celery_events.task', use_routes=False))
+        registry.remote_event('another_app', 'event_2')
+        self.addCleanup(setattr, registry, 'events', [])
+        remote_events = []
+
+        with mock.patch.object(DjangoDBBackend, 'sync_remote_events', autospec=True) as mock_sync_remote_events, \
+                mock.patch.object(DjangoDBBackend, 'renew_sync_lock', autospec=True) as mock_renew_sync_lock:
+            mock_sync_remote_events.side_effect = lambda backend: remote_events.append(backend.registry.remote_events)
+            syncevents.Command(stdout=io.StringIO()).handle(lock=True, lock_timeout=0)
+            mock_renew_sync_lock.assert_called_once()
+
+        self.assertEqual([[remote_event]], remote_events)
+
+    @mock.patch('django_celery_events.backends.connections')
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_lock_timeout(self, mock_get_backend_class, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'sqlite'
+        mock_get_backend_class.return_value = DjangoDBBackend
+
+        with DjangoDBBackend(registry).sync_lock(), self.assertRaises(CommandError):
+            syncevents.Command().handle(lock=True, lock_timeout=0)
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_database(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+
+        syncevents.Command(stdout=io.StringIO()).handle(database='default')
+
+        self.assertEqual(1, models.Event.objects.using('default').count())
+
+    @mock.patch('django_celery_events.management.commands.syncevents.configs.get_backend_class')
+    def test_profile(self, mock_get_backend_class):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('django_celery_events', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        stdout = io.StringIO()
+
+        syncevents.Command(stdout=stdout).handle(profile=True)
+        for operation in ('sync_local_events', 'sync_remote_events', 'commit_changes', 'create_events'):
+            self.assertIn(operation, stdout.getvalue())
+        self.assertFalse(signals.backend_operation.has_listeners())
+
+
+class PublishingTestCase(TestCase):
+
+    def setUp(self):
+        apply_async_patcher = mock.patch('django_celery_events.tasks.broadcast_events.apply_async')
+        self.mock_apply_async = apply_async_patcher.start()
+        self.addCleanup(apply_async_patcher.stop)
+        self.event = Event.local_instance('app_1', 'event', app=app)
+
+    def test_publish_outside_transaction(self):
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            publishing.publish(self.event, {'pk': 1})
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 1}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publishing.publish(self.event, {'pk': 1})
+            publishing.publish(self.event, {'pk': 1})
+            publishing.publish(self.event, {'pk': 2})
+            self.mock_apply_async.assert_not_called()
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 1}], ['app_1', 'event', {'pk': 2}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_rolled_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publishing.publish(self.event, {'pk': 1})
+            try:
+                with transaction.atomic():
+                    publishing.publish(self.event, {'pk': 2})
+                    raise ValueError()
+            except ValueError:
+                pass
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 1}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_released_savepoints(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publishing.publish(self.event, {'pk': 1})
+            with transaction.atomic():
+                publishing.publish(self.event, {'pk': 2})
+                with transaction.atomic():
+                    publishing.publish(self.event, {'pk': 3})
+            try:
+                with transaction.atomic():
+                    publishing.publish(self.event, {'pk': 4})
+                    raise ValueError()
+            except ValueError:
+                pass
+            publishing.publish(self.event, {'pk': 2})
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 1}], ['app_1', 'event', {'pk': 2}], ['app_1', 'event', {'pk': 3}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_rolled_back_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    publishing.publish(self.event, {'pk': 1})
+                    raise ValueError()
+            except ValueError:
+                pass
+            publishing.publish(self.event, {'pk': 2})
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 2}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_on_commit_non_json_kwargs(self):
+        kwargs = {'on': datetime.datetime(2020, 1, 1), 'id': uuid.UUID(int=1)}
+        with self.captureOnCommitCallbacks(execute=True):
+            publishing.publish(self.event, kwargs)
+            publishing.publish(self.event, dict(kwargs))
+
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', kwargs]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publish_many(self):
+        count = publishing.publish_many(self.event, ({'pk': pk} for pk in range(5)), chunk_size=2)
+
+        self.assertEqual(5, count)
+        self.assertEqual(
+            [
+                [['app_1', 'event', {'pk': 0}], ['app_1', 'event', {'pk': 1}]],
+                [['app_1', 'event', {'pk': 2}], ['app_1', 'event', {'pk': 3}]],
+                [['app_1', 'event', {'pk': 4}]],
+            ],
+            [call[1]['args'][0] for call in self.mock_apply_async.call_args_list]
+        )
+
+    @mock.patch('django_celery_events.publishing.time.sleep')
+    def test_publish_many_rate_limit(self, mock_sleep):
+        publishing.publish_many(self.event, ({'pk': pk} for pk in range(3)), chunk_size=1, rate_limit=10)
+
+        self.assertEqual(3, self.mock_apply_async.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+        for call in mock_sleep.call_args_list:
+            self.assertLessEqual(call[0][0], 0.1)
+
+    def test_publishevents_model(self):
+        registry.create_local_event('app_1', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        event_objs = [models.Event.objects.create(app_name='app', event_name=str(i)) for i in range(3)]
+
+        publishevents.Command(stdout=io.StringIO()).handle(
+            app_name='app_1', event_name='event', model='django_celery_events.Event', kwarg='event_id', chunk_size=2
+        )
+        self.assertEqual(
+            [[{'event_id': event_objs[0].pk}, {'event_id': event_objs[1].pk}], [{'event_id': event_objs[2].pk}]],
+            [[kwargs for _, _, kwargs in call[1]['args'][0]] for call in self.mock_apply_async.call_args_list]
+        )
+
+    def test_publishevents_input(self):
+        registry.create_local_event('app_1', 'event')
+        self.addCleanup(setattr, registry, 'events', [])
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('{"pk": 1}\n\n{"pk": 2}\n')
+        self.addCleanup(os.remove, f.name)
+
+        publishevents.Command(stdout=io.StringIO()).handle(app_name='app_1', event_name='event', input=f.name)
+        self.mock_apply_async.assert_called_once_with(
+            args=[[['app_1', 'event', {'pk': 1}], ['app_1', 'event', {'pk': 2}]]],
+            queue=configs.get_broadcast_queue()
+        )
+
+    def test_publishevents_unknown_event(self):
+        with self.assertRaises(CommandError):
+            publishevents.Command().handle(app_name='app_1', event_name='event')
+
+
+class BroadcastEventsTestCase(TestCase):
+
+    def tearDown(self):
+        registry.events = []
+
+    @mock.patch('django_celery_events.tasks.current_app')
+    @mock.patch('django_celery_events.tasks.configs.get_backend_class')
+    def test_broadcast_events(self, mock_get_backend_class, mock_current_app):
+        mock_get_backend_class.return_value = None
+        event = registry.create_local_event('app_1', 'event')
+        event.add_task(Task.local_instance('task_1', queue='queue_1', use_routes=False))
+
+        tasks.broadcast_events([['app_1', 'event', {'pk': 1}], ['app_2', 'event', {}]])
+        mock_current_app.send_task.assert_called_once_with('task_1', kwargs={'pk': 1}, queue='queue_1')
+
+
+    @mock.patch('django_celery_events.tasks.current_app')
+    @mock.patch('django_celery_events.tasks.configs.get_backend_class')
+    def test_broadcast_events_with_routing_cache(self, mock_get_backend_class, mock_current_app):
+        mock_get_backend_class.return_value = DjangoDBBackend
+        registry.create_local_event('app_1', 'event')
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
+        event_obj.tasks.add(models.Task.objects.create(name='task_1', queue='queue_1'))
+        bump_routing_version()
+        routing_cache.invalidate()
+        self.addCleanup(routing_cache.invalidate)
+
+        tasks.broadcast_events([['app_1', 'event', {'pk': 1}]])
+        mock_current_app.send_task.assert_called_once_with('task_1', kwargs={'pk': 1}, queue='queue_1')
+
+        # The routing is unchanged, so only the routing version is read
+        with self.assertNumQueries(1):
+            tasks.broadcast_events([['app_1', 'event', {'pk': 2}]])
+        mock_current_app.send_task.assert_called_with('task_1', kwargs={'pk': 2}, queue='queue_1')
+
+class DjangoDBBackendCommandsTestCase(TestCase):
+
+    def setUp(self):
+        get_backend_class_patcher = mock.patch(
+            'django_celery_events.management.commands._utils.configs.get_backend_class'
+        )
+        mock_get_backend_class = get_backend_class_patcher.start()
+        mock_get_backend_class.return_value = DjangoDBBackend
+        self.addCleanup(get_backend_class_patcher.stop)
+
+    def test_dump_and_load(self):
+        event_obj = models.Event.objects.create(app_name='app_1', event_name='event')
+        event_obj.tasks.add(models.Task.objects.create(name='task_1', queue='queue_1'))
+        models.Event.objects.create(app_name='app_2', event_name='event')
+        with tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False) as f:
+            path = f.name
+        self.addCleanup(os.remove, path)
+
+        dumpevents.Command(stdout=io.StringIO()).handle(output=path)
+        models.Event.objects.all().delete()
+        models.Task.objects.all().delete()
+        loadevents.Command(stdout=io.StringIO()).handle(path=path)
+
+        self.assertEqual(
+            [('app_1', 'event', 'task_1', 'queue_1'), ('app_2', 'event', None, None)],
+            list(models.Event.objects.order_by('app_name').values_list(
+                'app_name', 'event_name', 'tasks__name', 'tasks__queue'
+            ))
+        )
+
+    def test_dump_to_stdout(self):
+        models.Event.objects.create(app_name='app_1', event_name='event')
+        stdout = io.StringIO()
+
+        dumpevents.Command(stdout=stdout).handle()
+        self.assertEqual('{"app_name":"app_1","event_name":"event","tasks":[]}\n', stdout.getvalue())
+
+    def test_load_invalid_event(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('{"app_name":"app_1"}\n')
+        self.addCleanup(os.remove, f.name)
+
+        with self.assertRaises(CommandError):
+            loadevents.Command(stdout=io.StringIO()).handle(path=f.name)
+
+    def test_not_db_backend(self):
+        with mock.patch(
+            'django_celery_events.management.commands._utils.configs.get_backend_class', return_value=None
+        ), self.assertRaises(CommandError):
+            dumpevents.Command().handle()
+
+    def test_prune(self):
+        models.Task.objects.create(name='task_1')
+        stdout = io.StringIO()
+
+        pruneevents.Command(stdout=stdout).handle(dry_run=True)
+        self.assertIn('1 tasks and 0 events would be deleted', stdout.getvalue())
+        self.assertEqual(1, models.Task.objects.count())
+
+        pruneevents.Command(stdout=stdout).handle()
+        self.assertEqual(0, models.Task.objects.count())
+
+    def test_prune_apps(self):
+        models.Event.objects.create(app_name='app_1', event_name='event')
+        models.Event.objects.create(app_name='app_2', event_name='event')
+        stdout = io.StringIO()
+
+        pruneevents.Command(stdout=stdout).handle(app_labels=['app_1'], older_than_days=None)
+        self.assertIn('0 tasks and 1 events deleted', stdout.getvalue())
+        self.assertEqual(['app_2'], list(models.Event.objects.values_list('app_name', flat=True)))
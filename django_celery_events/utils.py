@@ -1,16 +1,65 @@
-import importlib
+from itertools import islice
 
-from django.conf import settings
+from django.db import connections, router, transaction
 
+from django_celery_events import configs
 
-def bulk_create_with_ids(objs):
+
+def can_return_ids_from_bulk_insert(connection):
+    features = connection.features
+    return getattr(
+        features,
+        'can_return_rows_from_bulk_insert',
+        getattr(features, 'can_return_ids_from_bulk_insert', False)
+    )
+
+
+def bulk_create_with_ids(objs, batch_size=None, unique_fields=None, using=None):
+    """
+    Creates objs in bulk and returns them with their primary keys set. If the database cannot return primary keys from
+    bulk inserts, the keys are read back with one query per batch using unique_fields, or objs are saved one by one
+    when unique_fields is not given. batch_size defaults to the EVENTS_BULK_BATCH_SIZE setting, and using to the
+    database that writes of the model are routed to.
+    """
     if len(objs) > 0:
         model = objs[0]._meta.model
-        if 'postgresql' in settings.DATABASES['default']['ENGINE']:
-            objs = model.objects.bulk_create(objs)
+        using = using or router.db_for_write(model)
+        connection = connections[using]
+        if batch_size is None:
+            batch_size = configs.get_bulk_batch_size()
+
+        if can_return_ids_from_bulk_insert(connection):
+            objs = model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+        elif unique_fields:
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+                batch_size = batch_size or connection.ops.bulk_batch_size(unique_fields, objs)
+                _set_ids_by_unique_fields(model, objs, unique_fields, batch_size, using)
         else:
-            for obj in objs:
-                obj.save()
+            with transaction.atomic(using=using):
+                for obj in objs:
+                    obj.save(using=using)
 
     return objs
 
+
+def _set_ids_by_unique_fields(model, objs, unique_fields, batch_size, using):
+    lookup_field = unique_fields[0]
+    for objs_chunk in chunked(objs, batch_size):
+        values = {getattr(obj, lookup_field) for obj in objs_chunk}
+        pks = {
+            row[1:]: row[0]
+            for row in model.objects.using(using).filter(
+                **{lookup_field + '__in': values}
+            ).values_list('pk', *unique_fields)
+        }
+        for obj in objs_chunk:
+            obj.pk = pks[tuple(getattr(obj, field) for field in unique_fields)]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
@@ -6,6 +6,6 @@ setuptools.setup(
     author='Shao Fei',
     author_email='shaofei330@gmail.com',
     description='Django plugin for celery-events framework',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
     setup_requires=['wheel'],
 )